@@ -1,15 +1,28 @@
-"""The main bot."""
+"""The main bot.
+
+Run with `python bot.py`, or alongside other bots with `python -m polycore`.
+"""
 import logging
 
 from discord.ext import commands
+from polycore import ctx_logs, helpcmd
+
+from main import config
+
 
-from main import config, ctx_logs, helpcmd
+TOKEN = config.TOKEN
 
 
-logging.basicConfig(level=logging.INFO)
+def create_bot() -> commands.Bot:
+    """Create the bot and load its cogs."""
+    bot = commands.Bot(
+        command_prefix=config.PREFIX, help_command=helpcmd.Help()
+    )
+    ctx_logs.setup(bot)
+    bot.load_extension('cogs')
+    return bot
 
-bot = commands.Bot(command_prefix=config.PREFIX, help_command=helpcmd.Help())
-ctx_logs.setup(bot)
-bot.load_extension('cogs')
 
-bot.run(config.TOKEN)
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    create_bot().run(TOKEN)
@@ -1,8 +1,9 @@
 """Commands for creating and viewing games."""
 import discord
 from discord.ext import commands
+from polycore import schedule
 
-from main import checks, config, models
+from main import checks, config, leaderboard, models
 
 
 class Games(commands.Cog):
@@ -34,27 +35,59 @@ class Games(commands.Cog):
                 'or `mobile`.'
             )
             return
-        game = models.Game.create(limit=limit, is_steam=is_steam)
-        role = await ctx.guild.create_role(
-            name=game.name, colour=discord.Colour(0xe4b400), mentionable=True
-        )
-        observer_role = ctx.guild.get_role(config.OBSERVER_ROLE_ID)
-        category = await ctx.guild.create_category(name=game.name, overwrites={
-            ctx.guild.default_role: discord.PermissionOverwrite(
-                read_messages=False, send_messages=False),
-            observer_role: discord.PermissionOverwrite(read_messages=True),
-            role: discord.PermissionOverwrite(
-                read_messages=True, send_messages=True)
-        })
-        for channel in ('chat', 'role-play', 'policies', 'newsstand'):
-            await category.create_text_channel(name=channel)
-        game.role_id = role.id
-        game.category_id = category.id
-        game.save()
+        async with ctx.typing():
+            game = await models.Game.acreate(
+                limit=limit, is_steam=is_steam
+            )
+            try:
+                await game.setup(ctx.guild)
+            except discord.HTTPException:
+                ctx.logger.log(
+                    f'Setting up {game.name} failed. Do '
+                    f'`{ctx.prefix}setup-game {game.id}` to try again.'
+                )
+                raise
         await ctx.send(
             f'Created game {game.id} (<@&{config.WAITLIST_ROLE_ID}>).'
         )
 
+    @commands.command(
+        brief='Finish setting up a game.', name='setup-game',
+        aliases=['setup']
+    )
+    @checks.admin
+    async def setup_game(self, ctx: commands.Context, game: models.Game):
+        """Create the role, category or channels missing from a game.
+
+        Useful if creating a game failed part of the way through.
+
+        Example: `{{pre}}setup-game 12`
+        """
+        async with ctx.typing():
+            await game.setup(ctx.guild)
+        await ctx.send(f'Finished setting up {game.name}.')
+
+    @commands.command(
+        brief='Fix game member counts.', name='repair-counts',
+        aliases=['check-counts']
+    )
+    @checks.admin
+    async def repair_counts(self, ctx: commands.Context):
+        """Recount the members of every game, and fix any wrong counts.
+
+        The counts should always be right, so this is only needed if
+        something went wrong.
+
+        Example: `{{pre}}repair-counts`
+        """
+        async with ctx.typing():
+            repaired = await models.write(models.Game.repair_member_counts)
+        if repaired:
+            games = ', '.join(map(str, repaired))
+            await ctx.send(f'Fixed the member counts of games {games}.')
+        else:
+            await ctx.send('All member counts were already right.')
+
     @commands.command(
         brief='Join a game.', name='join-game', aliases=['j', 'join']
     )
@@ -128,7 +161,7 @@ class Games(commands.Cog):
             await ctx.send(f'{game.name} is already open.')
         else:
             game.is_open = True
-            game.save()
+            await game.asave()
             await ctx.send(f'Reopened game {game.id}.')
 
     @commands.command(
@@ -142,7 +175,7 @@ class Games(commands.Cog):
         """
         if game.is_open:
             game.is_open = False
-            game.save()
+            await game.asave()
             await ctx.send(f'Closed game {game.id}.')
         else:
             await ctx.send(f'{game.name} is already closed.')
@@ -156,7 +189,7 @@ class Games(commands.Cog):
         Example: `{{pre}}g 45`
         """
         if not game:
-            game = models.Game.get_or_none(
+            game = await models.Game.aget_or_none(
                 models.Game.category_id == ctx.channel.category_id
             )
             if not game:
@@ -167,8 +200,10 @@ class Games(commands.Cog):
                 return
         open_status = 'still open' if game.is_open else 'closed'
         platform = 'Steam' if game.is_steam else 'Mobile'
-        players = models.Player.select().join(models.GameMember).where(
-            models.GameMember.game == game
+        players = await models.read(
+            list, models.Player.select().join(models.GameMember).where(
+                models.GameMember.game == game
+            )
         )
         player_lines = []
         for player in players:
@@ -186,19 +221,91 @@ class Games(commands.Cog):
             colour=0xF58F29
         ).add_field(name='Players', value=players))
 
+    @commands.command(brief='See when players are awake.', aliases=['sc'])
+    async def schedule(
+            self, ctx: commands.Context, game: models.Game = None):
+        """See when the most players in a game are awake (8am to 10pm).
+
+        Defaults to the game category you use the command in, if any.
+
+        Example: `{{pre}}schedule 45`
+        """
+        if not game:
+            game = await models.Game.aget_or_none(
+                models.Game.category_id == ctx.channel.category_id
+            )
+            if not game:
+                await ctx.send(
+                    'No game specified and command not used in a game '
+                    'category.'
+                )
+                return
+        found = await game.load_schedule()
+        if found.windows:
+            awake = found.windows[0].awake
+            windows = '\n'.join(map(schedule.format_window, found.windows))
+            description = (
+                f'Most players awake ({awake}/{len(found.offsets)}):\n'
+                f'{windows}'
+            )
+        else:
+            description = 'No players with a timezone set.'
+        if found.unknown:
+            description += (
+                f'\n\n{found.unknown} players haven\'t set their timezone.'
+            )
+        await ctx.send(embed=discord.Embed(
+            title=f'Schedule for {game.name}',
+            description=description,
+            colour=0xF58F29
+        ))
+
+    @commands.command(
+        brief='Hand out tribes for a game.', name='assign-tribes',
+        aliases=['tribes']
+    )
+    async def assign_tribes(self, ctx: commands.Context, game: models.Game):
+        """Give each player in a game a different tribe that they own.
+
+        Example: `{{pre}}assign-tribes 12`
+        """
+        assigned = await models.read(game.assign_tribes)
+        if not assigned:
+            await ctx.send(f'{game.name} has no players yet.')
+            return
+        lines = []
+        for discord_id, tribe in assigned.items():
+            tribe = (
+                tribe.emoji(config.TRIBE_EMOJI_IDS) if tribe else '*none left*'
+            )
+            lines.append(f'<@{discord_id}> - {tribe}')
+        counts = await models.read(game.tribe_counts)
+        unowned = ' '.join(
+            tribe.emoji(config.TRIBE_EMOJI_IDS)
+            for tribe, count in counts.items() if not count
+        )
+        await ctx.send(embed=discord.Embed(
+            title=f'Tribes for {game.name}',
+            description='\n'.join(lines),
+            colour=0xF58F29
+        ).add_field(name='Owned by nobody', value=unowned or '*None*'))
+
     @commands.command(
         brief='View open games.', name='open-games', aliases=['games', 'gs']
     )
-    async def open_games(self, ctx: commands.Context):
-        """View a list of open games.
+    async def open_games(self, ctx: commands.Context, page: int = 1):
+        """View a list of open games, 20 to a page.
 
-        Example: `{{pre}}games`
+        Examples:
+        `{{pre}}games`
+        `{{pre}}games 2`
         """
         lines = []
-        for game in models.Game.select().where(
-                models.Game.is_open == True):    # noqa:E712
+        for game in await models.read(models.Game.open_games, page):
             lines.append(
-                f'Game `{game.id:>3}`, `{game.member_count:>2}` players.'
+                f'Game `{game.game_id:>3}`, '
+                f'`{game.member_count:>2}/{game.capacity}` players. '
+                f'{game.platform} game.'
             )
         await ctx.send('\n'.join(lines) or '*There\'s nothing here.*')
 
@@ -211,5 +318,16 @@ class Games(commands.Cog):
 
         Example: `{{pre}}win @Artemis @Dorian @JBHoTep`
         """
-        models.Player.give_many_wins([user.id for user in users])
-        await ctx.send('Done!')
+        totals = await models.Player.agive_many_wins(
+            [user.id for user in users]
+        )
+        await leaderboard.update(totals)
+        lines = [
+            f'<@{discord_id}> *({wins} wins)*'
+            for discord_id, wins in totals.items()
+        ]
+        await ctx.send(embed=discord.Embed(
+            title='Wins awarded',
+            description='\n'.join(lines) or '*No-one was given a win.*',
+            colour=0xF58F29
+        ))
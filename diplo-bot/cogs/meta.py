@@ -3,8 +3,9 @@ import datetime
 
 import discord
 from discord.ext import commands
+from polycore import errors
 
-from main import config, errors
+from main import checks, config, models
 
 
 ABOUT = 'A simple bot for tracking Diplotopia wins.'
@@ -64,6 +65,14 @@ class Meta(commands.Cog):
             f'\nResponse roundtrip: `{roundtrip_time}ms`'
         ))
 
+    @commands.command(
+        brief='View cache statistics.', name='cache-stats', hidden=True
+    )
+    @checks.admin
+    async def cache_stats(self, ctx: commands.Context):
+        """See how well the player cache is working."""
+        await ctx.send(f'Player cache: {models.player_cache}')
+
     @commands.command(brief='Try out the archer.', hidden=True)
     async def pong(self, ctx: commands.Context):
         """See how fast Archer can respond."""
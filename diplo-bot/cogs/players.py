@@ -3,9 +3,10 @@ import typing
 
 import discord
 from discord.ext import commands
+from polycore import timezones
+from polycore.tribes import TribeList
 
-from main import models, timezones
-from main.tribes import TribeList
+from main import config, leaderboard, models
 
 
 class Players(commands.Cog):
@@ -15,30 +16,48 @@ class Players(commands.Cog):
         """Store a reference to the bot."""
         self.bot = bot
 
-    @commands.command(brief='View the leaderboard.', aliases=['lb'])
-    async def leaderboard(self, ctx: commands.Context):
-        """Get the leaderboard.
+    @commands.command(
+        brief='View the leaderboard.', name='leaderboard', aliases=['lb']
+    )
+    async def view_leaderboard(self, ctx: commands.Context, page: int = 1):
+        """Get the leaderboard, 10 players to a page.
 
-        Example: `{{pre}}leaderboard`
+        Examples:
+        `{{pre}}leaderboard`
+        `{{pre}}lb 2`
         """
-        data = models.Player.get_leaderboard()
-        lines = []
-        n = 0
-        joint_count = 0
-        previous_score = None
-        for discord_id, wins in data:
-            if previous_score != wins:
-                n += joint_count + 1
-                joint_count = 0
-            else:
-                joint_count += 1
-            previous_score = wins
-            lines.append(f'**#{n}** <@{discord_id}> *({wins} wins)*')
+        board = await leaderboard.get_leaderboard()
+        pages = max((len(board) + 9) // 10, 1)
+        page = min(max(page, 1), pages)
+        lines = [
+            f'**#{entry.rank}** <@{entry.discord_id}> *({entry.wins} wins)*'
+            for entry in board.page(page)
+        ]
         await ctx.send(embed=discord.Embed(
             title='Diplotopia Leaderboard',
             description='\n'.join(lines) or '*There\'s nothing here!*',
             colour=0xF58F29
-        ))
+        ).set_footer(text=f'Page {page}/{pages}'))
+
+    @commands.command(brief='View a leaderboard rank.')
+    async def rank(
+            self, ctx: commands.Context, *,
+            user: typing.Optional[discord.Member] = None):
+        """Get a player's rank on the leaderboard (defaults to your own).
+
+        Examples:
+        `{{pre}}rank @Artemis`
+        `{{pre}}rank`
+        """
+        user = user or ctx.author
+        board = await leaderboard.get_leaderboard()
+        if entry := board.rank(user.id):
+            await ctx.send(
+                f'{user.display_name} is **#{entry.rank}** of {len(board)} '
+                f'on the leaderboard, with {entry.wins} wins.'
+            )
+        else:
+            await ctx.send(f'{user.display_name} has no wins yet.')
 
     @commands.command(brief='View a profile.', aliases=['profile', 'p'])
     async def player(
@@ -51,18 +70,19 @@ class Players(commands.Cog):
         `{{pre}}p`
         """
         user = user or ctx.author
-        player = models.Player.get_player(user.id)
-        games = len(models.GameMember.select().where(
+        player = await models.Player.aget_player(user.id)
+        games = await models.read(models.GameMember.select().where(
             models.GameMember.player == player
-        ))
+        ).count)
         tz = player.utc_offset or 'Unknown'
         steam = player.steam_name or 'Unknown'
         mobile = player.mobile_name or 'Unkown'
+        tribes = player.tribes.emojis(config.TRIBE_EMOJI_IDS)
         embed = discord.Embed(
             title=user.display_name,
             description=(
                 f'Steam name: {steam}\nMobile name: {mobile}\n'
-                f'Timezone: {tz}\nTribes: {player.tribes}\nGames: {games}\n'
+                f'Timezone: {tz}\nTribes: {tribes}\nGames: {games}\n'
                 f'Wins: {player.wins}'
             ),
             colour=0xF58F29
@@ -81,9 +101,9 @@ class Players(commands.Cog):
         `{{pre}}add-tribes elyrion yad ven l k p`
         `{{pre}}at all`
         """
-        player = models.Player.get_player(ctx.author.id)
+        player = await models.Player.aget_player(ctx.author.id)
         player.tribes += tribes
-        player.save()
+        await player.asave()
         await ctx.send('Added to your tribes :thumbsup:')
 
     @commands.command(
@@ -95,9 +115,9 @@ class Players(commands.Cog):
 
         Example: `{{pre}}rt lux pol`
         """
-        player = models.Player.get_player(ctx.author.id)
+        player = await models.Player.aget_player(ctx.author.id)
         player.tribes -= tribes
-        player.save()
+        await player.asave()
         await ctx.send('Removed from your tribes :thumbsup:')
 
     @commands.command(
@@ -109,9 +129,9 @@ class Players(commands.Cog):
 
         Example: `{{pre}}mn artemisdev`
         """
-        player = models.Player.get_player(ctx.author.id)
+        player = await models.Player.aget_player(ctx.author.id)
         player.mobile_name = name
-        player.save()
+        await player.asave()
         await ctx.send('Updated your mobile name :thumbsup:')
 
     @commands.command(
@@ -123,9 +143,9 @@ class Players(commands.Cog):
 
         Example: `{{pre}}sn artemisdev`
         """
-        player = models.Player.get_player(ctx.author.id)
+        player = await models.Player.aget_player(ctx.author.id)
         player.steam_name = name
-        player.save()
+        await player.asave()
         await ctx.send('Updated your steam name :thumbsup:')
 
     @commands.command(
@@ -142,9 +162,10 @@ class Players(commands.Cog):
         `{{pre}}tz UTC+2:30`
         `{{pre}}tz -4`
         """
-        player = models.Player.get_player(ctx.author.id)
+        player = await models.Player.aget_player(ctx.author.id)
         player.utc_offset = timezone
-        player.save()
+        await player.asave()
+        models.schedules.set_offset(player.discord_id, player.utc_timedelta)
         await ctx.send('Updated your timezone :thumbsup:')
 
     @commands.command(
@@ -155,11 +176,9 @@ class Players(commands.Cog):
 
         Example: `{{pre}}search artemisdev`
         """
-        search = in_game_name.lower()
-        matches = list(models.Player.select().where(
-            (models.Player.mobile_name ** f'%{search}%')
-            | (models.Player.steam_name ** f'%{search}%')
-        ))
+        matches = await models.read(
+            models.Player.search_names, in_game_name
+        )
         if not matches:
             await ctx.send(
                 f'No player found by in-game name `{in_game_name}`.'
@@ -168,10 +187,10 @@ class Players(commands.Cog):
         lines = []
         for match in matches:
             name_matches = []
-            if match.mobile_name and search in match.mobile_name.lower():
-                name_matches.append(f'**{match.mobile_name}** (mobile)')
-            if match.steam_name and search in match.steam_name.lower():
-                name_matches.append(f'**{match.steam_name}** (steam)')
+            if match.mobile_name:
+                name_matches.append(f'{match.mobile_name} (mobile)')
+            if match.steam_name:
+                name_matches.append(f'{match.steam_name} (steam)')
             names = ' or '.join(name_matches)
             lines.append(
                 f'<@{match.discord_id}> - {names}')
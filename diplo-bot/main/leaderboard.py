@@ -0,0 +1,89 @@
+"""A ranked leaderboard of players' wins, kept in memory.
+
+The leaderboard is loaded from the database the first time it is needed,
+and then kept up to date as wins are awarded, so viewing it doesn't need a
+query. Entries are kept sorted so that a player's rank can be found by
+binary search.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+from collections import namedtuple
+from typing import Optional
+
+from . import models
+
+
+Entry = namedtuple('Entry', ['rank', 'discord_id', 'wins'])
+
+_leaderboard: Optional[Leaderboard] = None
+_loading: Optional[asyncio.Lock] = None
+
+
+class Leaderboard:
+    """Every player with at least one win, ranked by wins."""
+
+    def __init__(self, wins: dict[int, int]):
+        """Rank players, given the wins of each."""
+        self.wins = {
+            discord_id: count for discord_id, count in wins.items() if count
+        }
+        # Sorted (-wins, discord_id) pairs, so most wins come first.
+        self.entries = sorted(
+            (-count, discord_id) for discord_id, count in self.wins.items()
+        )
+
+    def __len__(self) -> int:
+        """Count the players on the leaderboard."""
+        return len(self.entries)
+
+    def update(self, totals: dict[int, int]):
+        """Set the wins of some players."""
+        for discord_id, count in totals.items():
+            if old := self.wins.pop(discord_id, 0):
+                index = bisect.bisect_left(self.entries, (-old, discord_id))
+                del self.entries[index]
+            if count:
+                self.wins[discord_id] = count
+                bisect.insort(self.entries, (-count, discord_id))
+
+    def rank_of_wins(self, count: int) -> int:
+        """Get the rank of a player with some number of wins.
+
+        Players with the same number of wins share a rank.
+        """
+        return bisect.bisect_left(self.entries, (-count,)) + 1
+
+    def rank(self, discord_id: int) -> Optional[Entry]:
+        """Get a player's leaderboard entry, if they have any wins."""
+        if count := self.wins.get(discord_id):
+            return Entry(self.rank_of_wins(count), discord_id, count)
+        return None
+
+    def page(self, page: int = 1, per_page: int = 10) -> list[Entry]:
+        """Get a page of the leaderboard."""
+        start = max(page - 1, 0) * per_page
+        entries = []
+        for negative_wins, discord_id in self.entries[start:start + per_page]:
+            count = -negative_wins
+            entries.append(Entry(self.rank_of_wins(count), discord_id, count))
+        return entries
+
+
+async def get_leaderboard() -> Leaderboard:
+    """Get the leaderboard, loading it if necessary."""
+    global _leaderboard, _loading
+    if not _loading:
+        _loading = asyncio.Lock()
+    async with _loading:
+        if _leaderboard is None:
+            _leaderboard = Leaderboard(
+                await models.read(models.Player.get_win_totals)
+            )
+    return _leaderboard
+
+
+async def update(totals: dict[int, int]):
+    """Set the wins of some players on the leaderboard."""
+    (await get_leaderboard()).update(totals)
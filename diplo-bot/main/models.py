@@ -1,23 +1,89 @@
-"""Peewee ORM models."""
+"""Peewee ORM models.
+
+Queries block, so coroutines should run them with `read` or `write`, which
+run them on the database's own threads (see `polycore.db`).
+"""
 from __future__ import annotations
 
+import datetime
 from collections import namedtuple
+from typing import Any, Iterable, Optional, Union
 
 import discord
 from discord.ext import commands
 
 import peewee
+from polycore import provision, schedule, timezones
+from polycore.db import AsyncModel, AsyncSqliteDatabase
+from polycore.lru import LRUCache
+from polycore.tribes import assign_tribes, Tribe, TribeList, TribeListField
 
-from . import config, timezones
-from .tribes import Tribe, TribeList, TribeListField
+from . import config
 
 
 UserData = namedtuple('UserData', ['name', 'to_be', 'user'])
-
-db = peewee.SqliteDatabase(str(config.BASE_PATH / 'db.sqlite3'))
-
-
-class BaseModel(peewee.Model):
+GAME_CHANNELS = ('chat', 'role-play', 'policies', 'newsstand')
+OpenGame = namedtuple('OpenGame', [
+    'game_id', 'member_count', 'capacity', 'platform'
+])
+# The names are highlighted where they match, or None if they don't.
+NameMatch = namedtuple(
+    'NameMatch', ['discord_id', 'mobile_name', 'steam_name']
+)
+
+PLAYER_CACHE_SIZE = 1000
+
+# The version of the latest migration. Tables are created up to date, so a
+# new database starts with every migration up to this one recorded as
+# applied. This must be updated whenever a migration is added.
+SCHEMA_VERSION = 7
+
+# Recently used players by discord ID, so that active players' profiles
+# needn't be loaded for every command. Only used from the event loop.
+player_cache = LRUCache(PLAYER_CACHE_SIZE)
+# When the players in each game are awake.
+schedules = schedule.ScheduleIndex()
+
+# A full text index of players' names, split into trigrams so that any part
+# of a name can be searched for. It reads names from the player table, and
+# triggers keep it up to date as players are added and changed. New player
+# tables are created with it, and older ones get it from a migration.
+NAME_INDEX_SQL = (
+    'CREATE VIRTUAL TABLE player_name_fts USING fts5('
+    'mobile_name, steam_name, content=player, content_rowid=discord_id, '
+    'tokenize=trigram)',
+    'CREATE TRIGGER player_name_fts_insert AFTER INSERT ON player BEGIN '
+    'INSERT INTO player_name_fts(rowid, mobile_name, steam_name) '
+    'VALUES (new.discord_id, new.mobile_name, new.steam_name); END',
+    'CREATE TRIGGER player_name_fts_delete AFTER DELETE ON player BEGIN '
+    'INSERT INTO player_name_fts('
+    'player_name_fts, rowid, mobile_name, steam_name) '
+    "VALUES ('delete', old.discord_id, old.mobile_name, old.steam_name); END",
+    'CREATE TRIGGER player_name_fts_update '
+    'AFTER UPDATE OF mobile_name, steam_name ON player BEGIN '
+    'INSERT INTO player_name_fts('
+    'player_name_fts, rowid, mobile_name, steam_name) '
+    "VALUES ('delete', old.discord_id, old.mobile_name, old.steam_name); "
+    'INSERT INTO player_name_fts(rowid, mobile_name, steam_name) '
+    'VALUES (new.discord_id, new.mobile_name, new.steam_name); END'
+)
+NAME_SEARCH_SQL = (
+    'SELECT rowid, mobile_name, steam_name, '
+    "highlight(player_name_fts, 0, '**', '**'), "
+    "highlight(player_name_fts, 1, '**', '**') "
+    'FROM player_name_fts WHERE player_name_fts MATCH ? '
+    'ORDER BY rank LIMIT ?'
+)
+
+db = AsyncSqliteDatabase(
+    str(config.BASE_PATH / 'db.sqlite3'),
+    pragmas={'journal_mode': 'wal', 'synchronous': 'normal'}
+)
+read = db.read
+write = db.write
+
+
+class BaseModel(AsyncModel):
     """Base model to set default settings."""
 
     class Meta:
@@ -31,7 +97,7 @@ class Player(BaseModel):
     """Model representing a player."""
 
     discord_id = peewee.IntegerField(primary_key=True)
-    wins = peewee.IntegerField(default=0)
+    wins = peewee.IntegerField(default=0, index=True)
     mobile_name = peewee.TextField(null=True)
     steam_name = peewee.TextField(null=True)
     utc_offset = timezones.TimezoneField(null=True)
@@ -39,6 +105,14 @@ class Player(BaseModel):
         Tribe.XIN_XI, Tribe.BARDUR, Tribe.OUMAJI, Tribe.IMPERIUS
     )))
 
+    class Meta:
+        """Peewee settings."""
+
+        # Players are cached for a long time, so saving a cached player
+        # must only write what was changed, not overwrite columns (like
+        # wins) which may have been updated since it was loaded.
+        only_save_dirty = True
+
     @classmethod
     def get_player(cls, discord_id: int) -> Player:
         """Get a player by discord ID, or create one if not found."""
@@ -47,24 +121,125 @@ class Player(BaseModel):
         return cls.create(discord_id=discord_id)
 
     @classmethod
-    def give_many_wins(cls, discord_ids: list[int]):
-        """Award a win to multiple players."""
-        for discord_id in discord_ids:
-            player = cls.get_player(discord_id)
-            player.wins += 1
-            player.save()
+    async def aget_player(cls, discord_id: int) -> Player:
+        """Awaitable version of get_player, which uses the cache."""
+        if player := player_cache.get(discord_id):
+            return player
+        player = await cls.aget_or_none(cls.discord_id == discord_id)
+        if not player:
+            # Check again on the writer thread, in case of a concurrent
+            # create.
+            player = await write(cls.get_player, discord_id)
+        player_cache.put(discord_id, player)
+        return player
+
+    async def asave(self, *args: Any, **kwargs: Any) -> int:
+        """Awaitable version of save, which also updates the cache.
+
+        Use this rather than `save`, which leaves any cached copy of the
+        player out of date.
+        """
+        try:
+            saved = await super().asave(*args, **kwargs)
+        except Exception:
+            # Don't leave unsaved changes in the cache.
+            player_cache.discard(self.discord_id)
+            raise
+        player_cache.put(self.discord_id, self)
+        return saved
+
+    @classmethod
+    async def agive_many_wins(cls, discord_ids: list[int]) -> dict[int, int]:
+        """Awaitable version of give_many_wins, which updates the cache."""
+        totals = await write(cls.give_many_wins, discord_ids)
+        for discord_id, wins in totals.items():
+            if player := player_cache.peek(discord_id):
+                # Set the value directly, so that wins isn't marked as changed
+                # and written back (stale) the next time the player is saved.
+                player.__data__['wins'] = wins
+        return totals
+
+    @classmethod
+    def give_many_wins(cls, discord_ids: list[int]) -> dict[int, int]:
+        """Award a win to multiple players, and get their new win totals.
+
+        Players are created if they don't exist yet. Each player only gets
+        one win, even if they are given more than once.
+        """
+        discord_ids = list(dict.fromkeys(discord_ids))
+        totals = {}
+        with db.atomic():
+            for batch in peewee.chunked(discord_ids, 100):
+                cls.insert_many(
+                    {'discord_id': discord_id, 'wins': 1}
+                    for discord_id in batch
+                ).on_conflict(
+                    conflict_target=[cls.discord_id],
+                    update={cls.wins: cls.wins + 1}
+                ).execute()
+                totals.update(cls.select(cls.discord_id, cls.wins).where(
+                    cls.discord_id.in_(batch)
+                ).tuples())
+        return totals
+
+    @classmethod
+    def get_win_totals(cls) -> dict[int, int]:
+        """Get the wins of every player with at least one, by discord ID."""
+        return dict(
+            cls.select(cls.discord_id, cls.wins).where(cls.wins > 0).tuples()
+        )
+
+    @property
+    def utc_timedelta(self) -> Optional[datetime.timedelta]:
+        """Get the player's UTC offset, or None if it isn't known."""
+        return self.utc_offset.timedelta if self.utc_offset else None
+
+    @classmethod
+    def tribe_counts(
+            cls,
+            players: Optional[peewee.ModelSelect] = None) -> dict[Tribe, int]:
+        """Count how many players own each tribe, in a single query.
+
+        `players` is a query for the players to count, by default everyone.
+        """
+        if players is None:
+            players = cls.select()
+        counts = players.select(*cls.tribes.count_owners()).scalar(
+            as_tuple=True
+        )
+        return {tribe: count or 0 for tribe, count in zip(Tribe, counts)}
 
     @classmethod
-    def get_leaderboard(cls) -> list[tuple[int, int]]:
-        """Get the leaderboard.
+    def search_names(cls, search: str, limit: int = 20) -> list[NameMatch]:
+        """Search for players by in-game name (mobile or steam).
 
-        Returns a list of tuples, each tuple is (discord_id, wins).
+        The best matches come first.
         """
-        query = cls.select().where(cls.wins != 0).order_by(-cls.wins).limit(10)
-        lb = []
-        for player in query:
-            lb.append((player.discord_id, player.wins))
-        return lb
+        if has_name_index and len(search) >= 3:
+            phrase = '"' + search.replace('"', '""') + '"'
+            rows = db.execute_sql(NAME_SEARCH_SQL, (phrase, limit))
+            return [
+                NameMatch(
+                    discord_id,
+                    marked_mobile if marked_mobile != mobile else None,
+                    marked_steam if marked_steam != steam else None
+                ) for discord_id, mobile, steam, marked_mobile, marked_steam
+                in rows
+            ]
+        # The index can only find searches of at least three characters.
+        query = cls.select(
+            cls.discord_id, cls.mobile_name, cls.steam_name
+        ).where(
+            (cls.mobile_name ** f'%{search}%')
+            | (cls.steam_name ** f'%{search}%')
+        ).limit(limit)
+        return [
+            NameMatch(
+                player.discord_id,
+                highlight(player.mobile_name, search),
+                highlight(player.steam_name, search)
+            ) for player in query
+        ]
 
 
 class Game(BaseModel):
@@ -75,6 +250,8 @@ class Game(BaseModel):
     is_open = peewee.BooleanField(default=True)
     is_steam = peewee.BooleanField(default=False)
     limit = peewee.IntegerField(default=14)
+    # Kept up to date as members join and leave, so they needn't be counted.
+    member_count = peewee.IntegerField(default=0)
 
     @classmethod
     async def convert(cls, ctx: commands.Context, raw_argument: str) -> Game:
@@ -85,24 +262,181 @@ class Game(BaseModel):
             raise commands.BadArgument(
                 f'Invalid game ID `{raw_argument}` (not a number).'
             )
-        game = cls.get_or_none(cls.id == game_id)
+        game = await cls.aget_or_none(cls.id == game_id)
         if not game:
             raise commands.BadArgument(f'Game {game_id} not found.')
         return game
 
+    @classmethod
+    def open_games(cls, page: int = 1, per_page: int = 20) -> list[OpenGame]:
+        """Get a page of the games that are open."""
+        query = cls.select(
+            cls.id, cls.member_count, cls.limit, cls.is_steam
+        ).where(
+            cls.is_open == True    # noqa:E712
+        ).order_by(cls.id).paginate(page, per_page).tuples()
+        return [
+            OpenGame(
+                game_id, count, limit, 'Steam' if is_steam else 'Mobile'
+            ) for game_id, count, limit, is_steam in query
+        ]
+
     @property
     def name(self) -> str:
         """Get the game's displayable name."""
         return f'Game {self.id}'
 
-    @property
-    def member_count(self) -> int:
-        """Count the members in the game."""
-        return GameMember.select().where(GameMember.game == self).count()
+    def players(self) -> peewee.ModelSelect:
+        """Make a query for the players in the game."""
+        return Player.select().join(GameMember).where(GameMember.game == self)
+
+    def players_owning(
+            self, tribes: Union[Tribe, Iterable[Tribe]]) -> list[Player]:
+        """Get the players in the game who own every one of some tribes."""
+        return list(self.players().where(Player.tribes.contains_all(tribes)))
+
+    def tribe_counts(self) -> dict[Tribe, int]:
+        """Count how many players in the game own each tribe."""
+        return Player.tribe_counts(self.players())
 
-    def get_member(self, player: Player) -> GameMember:
+    def assign_tribes(self) -> dict[int, Optional[Tribe]]:
+        """Give as many players as possible a different tribe they own.
+
+        Returns the tribe for each player by discord ID, or None for players
+        that couldn't be given one.
+        """
+        return assign_tribes(dict(
+            self.players().select(Player.discord_id, Player.tribes).tuples()
+        ))
+
+    def player_offsets(self) -> dict[int, Optional[datetime.timedelta]]:
+        """Get the UTC offset of each player in the game, by discord ID."""
+        return {
+            discord_id: timezone.timedelta if timezone else None
+            for discord_id, timezone in self.players().select(
+                Player.discord_id, Player.utc_offset
+            ).tuples()
+        }
+
+    async def load_schedule(self) -> schedule.Schedule:
+        """Get when the game's players are awake, loading it if necessary."""
+        if not (found := schedules.get(self.id)):
+            found = schedules.load(self.id, await read(self.player_offsets))
+        return found
+
+    def save(self, *args: Any, **kwargs: Any) -> int:
+        """Save the game, without overwriting the member count.
+
+        The stored count may have changed since this game was loaded, so it
+        is only changed by `change_member_count`.
+        """
+        if self.id is not None and 'only' not in kwargs:
+            kwargs['only'] = [
+                field for field in self._meta.sorted_fields
+                if field is not Game.member_count
+            ]
+        return super().save(*args, **kwargs)
+
+    def change_member_count(self, change: int):
+        """Add to (or subtract from) the member count of the game.
+
+        This should be run in the same transaction as the change to the
+        game's members.
+        """
+        Game.update(member_count=Game.member_count + change).where(
+            Game.id == self.id
+        ).execute()
+        self.member_count += change
+
+    @classmethod
+    def repair_member_counts(
+            cls, game_ids: Optional[list[int]] = None) -> list[int]:
+        """Recount the members of games, fixing any wrong counts.
+
+        Every game is recounted unless a list of game IDs is given. Returns
+        the IDs of the games which had wrong counts.
+        """
+        games = cls.select(cls.id, cls.member_count)
+        members = GameMember.select(
+            GameMember.game_id, peewee.fn.COUNT(GameMember.id)
+        ).group_by(GameMember.game_id)
+        if game_ids is not None:
+            games = games.where(cls.id.in_(game_ids))
+            members = members.where(GameMember.game_id.in_(game_ids))
+        counts = dict(members.tuples())
+        repaired = []
+        for game in games:
+            count = counts.get(game.id, 0)
+            if count != game.member_count:
+                cls.update(member_count=count).where(
+                    cls.id == game.id
+                ).execute()
+                repaired.append(game.id)
+        return repaired
+
+    async def setup(self, guild: discord.Guild):
+        """Setup the Discord role, category and channels for this game.
+
+        Anything which still exists from an earlier, failed attempt is
+        reused, so this can be run again to finish setting up a game.
+        """
+        async def new_category(done: dict) -> discord.CategoryChannel:
+            observer_role = guild.get_role(config.OBSERVER_ROLE_ID)
+            return await guild.create_category(name=self.name, overwrites={
+                guild.default_role: discord.PermissionOverwrite(
+                    read_messages=False, send_messages=False),
+                observer_role: discord.PermissionOverwrite(
+                    read_messages=True),
+                done['role']: discord.PermissionOverwrite(
+                    read_messages=True, send_messages=True)
+            })
+
+        def new_channel(name: str, position: int) -> provision.Step:
+            return provision.Step(
+                ('category',),
+                lambda done: done['category'].create_text_channel(
+                    name=name, position=position
+                )
+            )
+
+        steps = {
+            'role': provision.Step((), lambda done: guild.create_role(
+                name=self.name, colour=discord.Colour(0xe4b400),
+                mentionable=True
+            )),
+            'category': provision.Step(('role',), new_category)
+        }
+        for position, name in enumerate(GAME_CHANNELS):
+            steps[name] = new_channel(name, position)
+        done = {}
+        if role := guild.get_role(self.role_id):
+            done['role'] = role
+        if category := guild.get_channel(self.category_id):
+            done['category'] = category
+            for channel in category.text_channels:
+                if channel.name in GAME_CHANNELS:
+                    done[channel.name] = channel
+
+        async def save_progress(name: str, created: discord.abc.Snowflake):
+            if name in ('role', 'category'):
+                setattr(self, f'{name}_id', created.id)
+                await self.asave()
+
+        await provision.provision(steps, done, save_progress)
+
+    async def release(self, player: Player) -> bool:
+        """Give up a player's place in the game.
+
+        Returns False if they weren't in the game (any more).
+        """
+        if not await write(GameMember.leave, self, player):
+            return False
+        schedules.leave(self.id, player.discord_id)
+        return True
+
+    async def get_member(self, player: Player) -> GameMember:
         """Get the GameMember record associated with this game and a player."""
-        return GameMember.get_or_none(
+        return await GameMember.aget_or_none(
             GameMember.game == self,
             GameMember.player == player
         )
@@ -118,9 +452,13 @@ class Game(BaseModel):
 
     async def add_player(
             self, ctx: commands.Context, user: discord.Member = None):
-        """Add a player to the game."""
+        """Add a player to the game.
+
+        A place is reserved for them before they are given the role, so the
+        game can't be overfilled by players joining at the same time.
+        """
         user = self.user_info(ctx, user)
-        player = Player.get_player(user.user.id)
+        player = await Player.aget_player(user.user.id)
         if self.is_steam:
             if not player.steam_name:
                 ctx.logger.log(
@@ -137,27 +475,37 @@ class Game(BaseModel):
                     'set it.'
                 )
                 return
-        if self.get_member(player):
+        if self.member_count >= self.limit:
+            ctx.logger.log(f'Error: {self.name} is already full.')
+            return
+        try:
+            reserved = await write(GameMember.reserve, self, player)
+        except peewee.IntegrityError:
             ctx.logger.log(
                 f'Error: {user.name} {user.to_be} already in game {self.id}.'
             )
-        else:
-            GameMember.create(player=player, game=self)
-            role = ctx.guild.get_role(self.role_id)
-            await user.user.add_roles(role)
-            ctx.logger.log(f'Added {user.name} to game {self.id}.')
-            if self.member_count >= self.limit:
-                self.is_open = False
-                self.save()
-                ctx.logger.log(f'{self.name} full. Game closed.')
+            return
+        if not reserved:
+            ctx.logger.log(f'Error: {self.name} is already full.')
+            return
+        try:
+            await user.user.add_roles(ctx.guild.get_role(self.role_id))
+        except Exception:
+            await self.release(player)
+            raise
+        schedules.join(self.id, player.discord_id, player.utc_timedelta)
+        ctx.logger.log(f'Added {user.name} to game {self.id}.')
+        if self.member_count >= self.limit:
+            self.is_open = False
+            await self.asave()
+            ctx.logger.log(f'{self.name} full. Game closed.')
 
     async def remove_player(
             self, ctx: commands.Context, user: discord.Member = None):
         """Remove a player from the game."""
         user = self.user_info(ctx, user)
-        player = Player.get_player(user.user.id)
-        if member := self.get_member(player):
-            member.delete_instance()
+        player = await Player.aget_player(user.user.id)
+        if await self.release(player):
             role = ctx.guild.get_role(self.role_id)
             await user.user.remove_roles(role)
             ctx.logger.log(f'Removed {user.name} from game {self.id}.')
@@ -168,12 +516,99 @@ class Game(BaseModel):
 
 
 class GameMember(BaseModel):
-    """Many-to-many field between Game and Player."""
+    """Many-to-many field between Game and Player.
+
+    A player can only be in a game once.
+    """
 
     game = peewee.ForeignKeyField(model=Game)
     player = peewee.ForeignKeyField(model=Player)
 
+    class Meta:
+        """Peewee settings."""
+
+        indexes = ((('game', 'player'), True),)
+
+    @classmethod
+    def reserve(cls, game: Game, player: Player) -> bool:
+        """Reserve a place in a game for a player, if there is space.
+
+        This must be run in a transaction (eg. with `write`), so that the
+        place can't be taken between checking the member count and
+        inserting. The game's member count is refreshed from the database
+        and updated. Returns whether a place was reserved. Raises
+        IntegrityError if the player is already in the game.
+        """
+        game.member_count = Game.select(Game.member_count).where(
+            Game.id == game.id
+        ).scalar()
+        if game.member_count >= game.limit:
+            return False
+        cls.create(game=game, player=player)
+        game.change_member_count(1)
+        return True
+
+    @classmethod
+    def leave(cls, game: Game, player: Player) -> bool:
+        """Remove a player from a game, and update its member count.
+
+        This must be run in a transaction (eg. with `write`). Returns False
+        if the player wasn't in the game.
+        """
+        if not cls.delete().where(
+                cls.game == game, cls.player == player).execute():
+            return False
+        game.change_member_count(-1)
+        return True
+
+
+class AppliedMigration(BaseModel):
+    """A record of a migration having been applied to the database."""
+
+    version = peewee.IntegerField(primary_key=True)
+    applied_at = peewee.DateTimeField(default=datetime.datetime.utcnow)
+
+
+def create_tables(models: Iterable[type[BaseModel]]):
+    """Create the tables for some models, if they don't exist yet.
+
+    Existing tables are left alone: changes to them are made by migrations.
+    """
+    db.create_tables([model for model in models if not model.table_exists()])
+
+
+def highlight(name: Optional[str], search: str) -> Optional[str]:
+    """Highlight where a name contains a search, or get None if it doesn't."""
+    if name and (start := name.lower().find(search.lower())) != -1:
+        end = start + len(search)
+        return f'{name[:start]}**{name[start:end]}**{name[end:]}'
+    return None
+
+
+def create_name_index():
+    """Create the full text index of players' names, for a new player table.
+
+    The index needs SQLite 3.34 or later. If it can't be created, searches
+    are done with a (slower) LIKE query instead.
+    """
+    try:
+        with db.atomic():
+            for statement in NAME_INDEX_SQL:
+                db.execute_sql(statement)
+    except peewee.OperationalError:
+        pass
+
 
 MODELS = [Player, Game, GameMember]
 
-db.create_tables(MODELS)
+if not db.get_tables():
+    create_tables([AppliedMigration])
+    AppliedMigration.insert_many(
+        {'version': version} for version in range(1, SCHEMA_VERSION + 1)
+    ).execute()
+if not Player.table_exists():
+    create_tables([Player])
+    create_name_index()
+create_tables(MODELS)
+# Older databases only have the index once its migration is applied.
+has_name_index = 'player_name_fts' in db.get_tables()
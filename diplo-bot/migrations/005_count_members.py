@@ -0,0 +1,13 @@
+"""Migration to store the number of members of each game."""
+from playhouse.migrate import migrate, SqliteMigrator
+from polycore.db import backfill
+
+from main.models import Game
+
+
+def apply(migrator: SqliteMigrator):
+    """Add a member count field to the game table, and fill it in."""
+    migrate(migrator.add_column('game', 'member_count', Game.member_count))
+    backfill(Game.select(Game.id), lambda games: Game.repair_member_counts(
+        [game.id for game in games]
+    ))
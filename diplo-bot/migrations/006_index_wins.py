@@ -0,0 +1,7 @@
+"""Migration to index players' wins, for the leaderboard."""
+from playhouse.migrate import migrate, SqliteMigrator
+
+
+def apply(migrator: SqliteMigrator):
+    """Add an index on the wins field of the player table."""
+    migrate(migrator.add_index('player', ('wins',)))
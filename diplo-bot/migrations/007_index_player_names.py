@@ -0,0 +1,16 @@
+"""Migration to add a full text index of players' names, for searching.
+
+The index needs SQLite 3.34 or later.
+"""
+from playhouse.migrate import SqliteMigrator
+
+from main.models import db, NAME_INDEX_SQL
+
+
+def apply(migrator: SqliteMigrator):
+    """Create the index and its triggers, and index the existing names."""
+    for statement in NAME_INDEX_SQL:
+        db.execute_sql(statement)
+    db.execute_sql(
+        "INSERT INTO player_name_fts(player_name_fts) VALUES ('rebuild')"
+    )
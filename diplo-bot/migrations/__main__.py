@@ -1,30 +1,61 @@
-"""Run migrations from the command line."""
+"""Run migrations from the command line.
+
+Applied migrations are recorded in the database, so running this with no
+arguments applies every migration that hasn't been applied yet. All the
+migrations in a run are applied in one transaction: if any of them fails,
+none of them are applied.
+
+A new database is created up to date. A database from before migrations
+were recorded has none recorded, so use `--fake` to record the ones which
+were already applied by hand.
+"""
 import argparse
 import importlib
 import sys
+import time
 
 from playhouse.migrate import SqliteMigrator
 
-from main.models import db
+from main.models import db, create_tables, AppliedMigration
 
 
 migrator = SqliteMigrator(db)
 
+# When adding a migration, also update SCHEMA_VERSION in main.models.
 MIGRATIONS = [
     '001_extend_profiles',
     '002_add_member_limit',
-    '003_add_steam'
+    '003_add_steam',
+    '004_index_game_members',
+    '005_count_members',
+    '006_index_wins',
+    '007_index_player_names'
 ]
 
 
+def get_version(migration: str) -> int:
+    """Get the version number of a migration."""
+    return int(migration.split('_')[0])
+
+
+def get_applied() -> set[int]:
+    """Get the versions of the migrations that have been applied."""
+    create_tables([AppliedMigration])
+    return {
+        migration.version for migration in AppliedMigration.select()
+    }
+
+
 def display_migrations():
     """Display a list of migrations to stdout."""
+    applied = get_applied()
     print('You can specify a migration by name or ID:\n')
     for migration in MIGRATIONS:
         raw_number, *name_parts = migration.split('_')
         name = '-'.join(name_parts)
         number = raw_number.lstrip('0')
-        print(f'{number:>3}: {name}')
+        status = 'applied' if get_version(migration) in applied else 'pending'
+        print(f'{number:>3}: {name} ({status})')
 
 
 def get_migration_by_id(migration_id: int) -> str:
@@ -47,7 +78,16 @@ def get_migration_by_name(raw_name: str) -> str:
 
 
 def parse_migrations(raw_migrations: list[str]) -> list[str]:
-    """Parse a list of migrations from the command line."""
+    """Parse a list of migrations from the command line.
+
+    If none are given, every pending migration is returned.
+    """
+    if not raw_migrations:
+        applied = get_applied()
+        return [
+            migration for migration in MIGRATIONS
+            if get_version(migration) not in applied
+        ]
     migrations = []
     for raw_migration in raw_migrations:
         try:
@@ -58,35 +98,71 @@ def parse_migrations(raw_migrations: list[str]) -> list[str]:
             migrations.append(get_migration_by_id(raw_migration_id))
         else:
             migrations.append(get_migration_by_name(raw_migration))
-    return migrations
+    return sorted(migrations, key=get_version)
 
 
-def apply_migrations(raw_migrations: list[str]):
-    """Apply a series of migrations to the database."""
+def apply_migration(migration: str):
+    """Apply a migration and record it, reporting how long it took."""
+    print('Applying migration', migration, end='... ', flush=True)
+    start = time.perf_counter()
+    module = importlib.import_module('.' + migration, 'migrations')
+    module.apply(migrator)
+    AppliedMigration.create(version=get_version(migration))
+    print(f'Done ({time.perf_counter() - start:.2f}s)')
+
+
+def apply_migrations(raw_migrations: list[str], fake: bool = False):
+    """Apply a series of migrations to the database, in one transaction.
+
+    If `fake` is true, the migrations are only recorded as applied.
+    """
     try:
         migrations = parse_migrations(raw_migrations)
     except ValueError as error:
         print(error)
         sys.exit(1)
-    for migration in migrations:
-        print('Applying migration', migration, end='... ')
-        module = importlib.import_module('.' + migration, 'migrations')
-        module.apply(migrator)
-        print('Done')
-    print('All migrations successful.')
+    if not migrations:
+        print('No migrations to apply.')
+        return
+    applied = get_applied()
+    if not applied and not fake:
+        print(
+            'No migrations have been recorded as applied. If any were '
+            'applied before they were recorded, record them with --fake.'
+        )
+    start = time.perf_counter()
+    try:
+        with db.atomic():
+            for migration in migrations:
+                if get_version(migration) in applied:
+                    print('Skipping migration', migration, '(already applied)')
+                elif fake:
+                    print('Recording migration', migration, 'as applied')
+                    AppliedMigration.create(version=get_version(migration))
+                else:
+                    apply_migration(migration)
+    except Exception:
+        print('Failed, so no migrations were applied.')
+        raise
+    print(f'All migrations successful ({time.perf_counter() - start:.2f}s).')
 
 
 parser = argparse.ArgumentParser(
-    description='Run specified migrations.', prog='migrations'
+    description='Run specified migrations, or all pending ones.',
+    prog='migrations'
 )
 parser.add_argument('migrations', nargs='*', help='The migrations to apply.')
 parser.add_argument(
     '-l', '--list', action='store_true',
     help='show a list of available migrations and exit'
 )
+parser.add_argument(
+    '--fake', action='store_true',
+    help='record the migrations as applied without applying them'
+)
 args = parser.parse_args()
 
 if args.list:
     display_migrations()
 else:
-    apply_migrations(args.migrations)
+    apply_migrations(args.migrations, fake=args.fake)
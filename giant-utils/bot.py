@@ -1,21 +1,30 @@
-"""The main bot."""
+"""The main bot.
+
+Run with `python bot.py`, or alongside other bots with `python -m polycore`.
+"""
 import json
 import logging
+import pathlib
 
-import discord
 from discord.ext import commands
 
 from tools.helpcmd import Help
 
 
-logging.basicConfig(level=logging.INFO)
-
-with open('config.json') as f:
+with open(pathlib.Path(__file__).parent / 'config.json') as f:
     config = json.load(f)
 
+TOKEN = config['token']
+
+
+def create_bot() -> commands.Bot:
+    """Create the bot and load its cogs."""
+    bot = commands.Bot(command_prefix=config['prefix'])
+    bot.load_extension('cogs')
+    bot.help_command = Help()
+    return bot
 
-bot = commands.Bot(command_prefix=config['prefix'])
-bot.load_extension('cogs')
-bot.help_command = Help()
 
-bot.run(config['token'])
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    create_bot().run(TOKEN)
@@ -1,9 +1,9 @@
 """The meta cog."""
 import discord
 from discord.ext import commands
+from polycore import colours
 
 from tools.errors import on_command_error
-from tools import colours
 
 
 ABOUT = (
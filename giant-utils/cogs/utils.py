@@ -10,6 +10,25 @@ from tools import nameedit, roles
 Ctx = commands.Context
 
 
+def _is_dry_run(mode: typing.Optional[str]) -> bool:
+    """Check the mode argument of a reset command."""
+    if mode is None:
+        return False
+    if mode.lower() == 'dry-run':
+        return True
+    raise commands.BadArgument(f'Unknown mode `{mode}`, try `dry-run`.')
+
+
+async def _progress_message(ctx: Ctx) -> roles.ProgressCallback:
+    """Send a message and get a callback which edits it to show progress."""
+    message = await ctx.send('Starting...')
+
+    async def on_progress(progress: roles.Progress):
+        await message.edit(content=str(progress))
+
+    return on_progress
+
+
 class Utils(commands.Cog):
     """Utility commands."""
 
@@ -28,17 +47,21 @@ class Utils(commands.Cog):
 
     @commands.has_permissions(manage_channels=True)
     @commands.command(brief='Reset a division category.')
-    async def reset(self, ctx: Ctx):
+    async def reset(self, ctx: Ctx, mode: typing.Optional[str] = None):
         """Reset a division category.
 
         This will delete every channel in this category, and add channels
         named #time-out-glitches-and-breaks, #general, #game-1, #game-2...
-        #game-8.
+        #game-8. Add `dry-run` to see what would be done without doing it.
 
-        Example: `{{pre}}reset`
+        Examples:
+        `{{pre}}reset`
+        `{{pre}}reset dry-run`
         """
         async with ctx.typing():
-            error = await nameedit.reset(ctx.channel)
+            error = await nameedit.reset(
+                ctx.channel, dry_run=_is_dry_run(mode)
+            )
         if error:
             await ctx.send(error)
         # no success message since a success means we have deleted the channel
@@ -47,17 +70,25 @@ class Utils(commands.Cog):
     @commands.command(
         brief='Reset the **entire** server.', name='reset-server'
     )
-    async def reset_server(self, ctx: Ctx):
+    async def reset_server(
+            self, ctx: Ctx, mode: typing.Optional[str] = None):
         """Resets the entire server - use with extreme caution.
 
         This will reset every division category, every division role, the
         follow-up category, the participant role, the kick out on sight role
-        and the in break role.
+        and the in break role. Add `dry-run` to see how much would be done,
+        and how long it would take, without doing it.
 
-        Example: `{{pre}}reset-server`
+        Examples:
+        `{{pre}}reset-server`
+        `{{pre}}reset-server dry-run`
         """
         async with ctx.typing():
-            await nameedit.reset_guild(ctx.guild)
+            summary = await nameedit.reset_guild(
+                ctx.guild, dry_run=_is_dry_run(mode)
+            )
+        if ctx.guild.get_channel(ctx.channel.id):    # It may have been reset.
+            await ctx.send(summary)
 
     @commands.command(
         brief='Award a role to many people.', name='mass-role'
@@ -70,8 +101,10 @@ class Utils(commands.Cog):
         Example: `{{pre}}mass-role @Division C @member1 @member2 @member3`
         """
         async with ctx.typing():
-            await roles.mass_role(role, users)
-        await ctx.send('Done :thumbsup:')
+            report = await roles.mass_role(
+                role, users, await _progress_message(ctx)
+            )
+        await ctx.send(str(report), file=report.file())
 
     @commands.command(brief='How many members a role has.')
     async def members(self, ctx, *, role: discord.Role):
@@ -91,5 +124,7 @@ class Utils(commands.Cog):
         Example: `{{pre}}clear-role @Division E`
         """
         async with ctx.typing():
-            await roles.mass_un_role(role)
-        await ctx.send('Done :thumbsup:')
+            report = await roles.mass_un_role(
+                role, await _progress_message(ctx)
+            )
+        await ctx.send(str(report), file=report.file())
@@ -1,11 +1,33 @@
 """Utilities for reading, writing and editing data."""
+import asyncio
+import atexit
+import concurrent.futures
 import json
+import os
+import pathlib
 import sqlite3
+import threading
 import typing
 
 
 client = None    # should be set externally
 
+# Relative data paths are resolved from the bot's folder, not the working
+# directory, so the bot can be run from anywhere.
+BASE_PATH = pathlib.Path(__file__).parent.parent
+
+JSON_FLUSH_INTERVAL = 5    # Seconds.
+
+SQL_COMMIT_DELAY = 0.5    # Seconds.
+SQL_MAX_BATCH = 50    # Writes per transaction.
+SQL_PRAGMAS = (
+    'journal_mode = WAL',
+    'synchronous = NORMAL',    # Safe in WAL mode, and avoids most fsyncs.
+    'cache_size = -8000',    # 8MB.
+    'temp_store = MEMORY',
+    'foreign_keys = ON'
+)
+
 
 def discorddata(fun: typing.Callable) -> typing.Callable:
     """Wrap a function to pass it the discord client."""
@@ -24,9 +46,100 @@ def asyncdiscord(fun: typing.Callable) -> typing.Callable:
     return wrapper
 
 
+class JsonStore:
+    """A JSON file, loaded once and kept in memory.
+
+    Changes are written back to the file in the background a few seconds
+    after they are made (or immediately, if there is no event loop running),
+    and any unsaved changes are written when the process exits. Files are
+    written to a temporary file and then renamed, so a crash part way
+    through a write can't leave the file corrupt.
+    """
+
+    def __init__(self, filepath: str):
+        """Load the data from the file."""
+        self.filepath = filepath
+        try:
+            with open(filepath) as file:
+                self.data = json.load(file)
+        except FileNotFoundError:
+            self.data = {}
+        self.dirty = False
+        self.version = 0
+        self.written_version = 0
+        self.write_lock = threading.Lock()
+        self.flush_handle: typing.Optional[asyncio.TimerHandle] = None
+
+    def mark_dirty(self):
+        """Record that the data has changed, and schedule a flush."""
+        self.dirty = True
+        if self.flush_handle:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        self.flush_handle = loop.call_later(
+            JSON_FLUSH_INTERVAL, self._flush_in_background, loop
+        )
+
+    def _snapshot(self) -> typing.Tuple[str, int]:
+        """Serialise the current data, and mark it as clean."""
+        self.dirty = False
+        self.version += 1
+        return json.dumps(self.data), self.version
+
+    def _flush_in_background(self, loop: asyncio.AbstractEventLoop):
+        """Serialise the data, then write it to disk on another thread."""
+        self.flush_handle = None
+        if self.dirty:
+            loop.run_in_executor(None, self._write, *self._snapshot())
+
+    def flush(self):
+        """Write any changes to disk immediately."""
+        if self.flush_handle:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if self.dirty:
+            self._write(*self._snapshot())
+
+    def _write(self, text: str, version: int):
+        """Atomically replace the file, unless it is already newer."""
+        with self.write_lock:
+            if version <= self.written_version:
+                return
+            temp_path = self.filepath + '.tmp'
+            with open(temp_path, 'w') as file:
+                file.write(text)
+            os.replace(temp_path, self.filepath)
+            self.written_version = version
+
+
+JSON_STORES: typing.Dict[str, JsonStore] = {}
+
+
+def _get_json_store(filepath: str) -> JsonStore:
+    """Load a JSON file (with caching)."""
+    filepath = str(BASE_PATH / filepath)
+    if filepath not in JSON_STORES:
+        JSON_STORES[filepath] = JsonStore(filepath)
+    return JSON_STORES[filepath]
+
+
+@atexit.register
+def flush_json_stores():
+    """Write any unsaved JSON changes to disk."""
+    for store in JSON_STORES.values():
+        store.flush()
+
+
 def jsondata(filepath: str) -> typing.Callable:
     """Return a wrapper for editing JSON files.
 
+    The file is only read once, and changes are written back in the
+    background (see JsonStore).
+
     Example usuage:
     ```python
     @jsondata('data.json')
@@ -39,14 +152,9 @@ def jsondata(filepath: str) -> typing.Callable:
     """
     def decorator(fun: typing.Callable) -> typing.Callable:
         def wrapper(*args: typing.Tuple, **kwargs: typing.Dict) -> typing.Any:
-            try:
-                with open(filepath) as file:
-                    data = json.load(file)
-            except FileNotFoundError:
-                data = {}
-            result = fun(data, *args, **kwargs)
-            with open(filepath, 'w') as file:
-                json.dump(data, file)
+            store = _get_json_store(filepath)
+            result = fun(store.data, *args, **kwargs)
+            store.mark_dirty()
             return result
 
         return wrapper
@@ -54,37 +162,128 @@ def jsondata(filepath: str) -> typing.Callable:
     return decorator
 
 
-DBS = {}
-
+class SqlSession:
+    """An SQLite connection which is only used from its own thread.
 
-def _get_db(filepath: str) -> sqlite3.Connection:
-    """Connect to a database (with caching)."""
-    if filepath in DBS:
-        return DBS[filepath]
-    DBS[filepath] = sqlite3.connect(filepath)
-    return DBS[filepath]
+    The database is put in WAL mode, so reads don't wait for writes. Each
+    write runs in a savepoint (so a failed call only undoes its own
+    changes), and writes are committed together in batches, shortly after
+    they are made.
+    """
 
+    def __init__(self, filepath: str):
+        """Connect to the database on a dedicated thread."""
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='sqldata'
+        )
+        self.lock = threading.RLock()
+        self.pending_writes = 0
+        self.commit_handle: typing.Optional[asyncio.TimerHandle] = None
+        self.db = self.executor.submit(self._connect, filepath).result()
 
-def sqldata(filepath: str = 'data/db.sqlite3') -> typing.Callable:
-    """Like jsondata but for SQL.
+    @staticmethod
+    def _connect(filepath: str) -> sqlite3.Connection:
+        """Open the connection and tune it."""
+        # isolation_level=None means we control transactions ourselves.
+        db = sqlite3.connect(
+            filepath, isolation_level=None, check_same_thread=False
+        )
+        for pragma in SQL_PRAGMAS:
+            db.execute(f'PRAGMA {pragma}')
+        return db
 
-    Passes wrapped function a function which accepts a parameterised
-    query and optional parameters, returning any rows returned by the query.
-    """
-    def decorator(fun: typing.Callable) -> typing.Callable:
-        def wrapper(*args: typing.Tuple, **kwargs: typing.Dict) -> typing.Any:
-            db = _get_db(filepath)
-            cur = db.cursor()
+    def _call(
+            self, fun: typing.Callable, readonly: bool,
+            args: typing.Tuple, kwargs: typing.Dict) -> typing.Any:
+        """Call a wrapped function (on the database thread)."""
+        with self.lock:
+            cur = self.db.cursor()
 
             def execute(query: str, *params: typing.Tuple
                         ) -> typing.List[typing.List[typing.Any]]:
                 cur.execute(query, params)
                 return cur.fetchall()
 
-            result = fun(execute, *args, **kwargs)
-            db.commit()
+            if readonly:
+                return fun(execute, *args, **kwargs)
+            if not self.db.in_transaction:
+                cur.execute('BEGIN')
+            cur.execute('SAVEPOINT sqldata')
+            try:
+                result = fun(execute, *args, **kwargs)
+            except BaseException:
+                cur.execute('ROLLBACK TO sqldata')
+                raise
+            finally:
+                cur.execute('RELEASE sqldata')
+            self.pending_writes += 1
+            if self.pending_writes >= SQL_MAX_BATCH:
+                self._commit()
             return result
 
+    def _commit(self):
+        """Commit any pending writes."""
+        with self.lock:
+            if self.db.in_transaction:
+                self.db.execute('COMMIT')
+            self.pending_writes = 0
+
+    def _commit_soon(self, loop: asyncio.AbstractEventLoop):
+        """Commit pending writes on the database thread."""
+        self.commit_handle = None
+        loop.run_in_executor(self.executor, self._commit)
+
+    async def call(
+            self, fun: typing.Callable, readonly: bool,
+            args: typing.Tuple, kwargs: typing.Dict) -> typing.Any:
+        """Call a wrapped function without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self.executor, self._call, fun, readonly, args, kwargs
+        )
+        if self.pending_writes and not self.commit_handle:
+            self.commit_handle = loop.call_later(
+                SQL_COMMIT_DELAY, self._commit_soon, loop
+            )
+        return result
+
+
+SQL_SESSIONS: typing.Dict[str, SqlSession] = {}
+
+
+def _get_sql_session(filepath: str) -> SqlSession:
+    """Connect to a database (with caching)."""
+    filepath = str(BASE_PATH / filepath)
+    if filepath not in SQL_SESSIONS:
+        SQL_SESSIONS[filepath] = SqlSession(filepath)
+    return SQL_SESSIONS[filepath]
+
+
+@atexit.register
+def commit_sql_sessions():
+    """Commit any pending SQL writes."""
+    for session in SQL_SESSIONS.values():
+        session._commit()
+
+
+def sqldata(
+        filepath: str = 'data/db.sqlite3',
+        readonly: bool = False) -> typing.Callable:
+    """Like jsondata but for SQL.
+
+    Passes wrapped function a function which accepts a parameterised
+    query and optional parameters, returning any rows returned by the query.
+
+    The wrapped function becomes a coroutine function, since it is run on
+    the database's own thread (see SqlSession). Pass `readonly=True` for
+    functions which don't write anything, so they don't start a transaction.
+    """
+    def decorator(fun: typing.Callable) -> typing.Callable:
+        async def wrapper(
+                *args: typing.Tuple, **kwargs: typing.Dict) -> typing.Any:
+            session = _get_sql_session(filepath)
+            return await session.call(fun, readonly, args, kwargs)
+
         return wrapper
 
     return decorator
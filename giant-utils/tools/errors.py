@@ -5,8 +5,7 @@ import traceback
 
 import discord
 from discord.ext.commands import Context
-
-from tools import colours
+from polycore import colours
 
 
 async def on_command_error(ctx: Context, error: Exception):
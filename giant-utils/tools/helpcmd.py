@@ -3,8 +3,7 @@ import typing
 
 import discord
 from discord.ext import commands
-
-from tools import colours
+from polycore import colours
 
 
 class Help(commands.DefaultHelpCommand):
@@ -1,41 +1,40 @@
 """Utility to allow people to rename channels."""
+import asyncio
 import re
+import typing
 
 import discord
-
-from .roles import mass_un_role
-
-
-LANGUAGE = [
-    'po', 'ly', 'lu', 'mi', 'lo', 'da', 'bi', 'oo', 'sa', 'ko', 'me', 'da',
-    'to', 'pi', 'as', 'an', 'ki'
-]
-ACTIONS = [
-    'Clowns', 'Bongo', 'Duh!', 'Squeal', 'Squirrel', 'Confusion', 'Gruff',
-    'Moan', 'Chickens', 'Spunge', 'Gnomes', 'Bell-boys', 'Gurkins',
-    'Commotion', 'LOL', 'Shenanigans', 'Hullabaloo', 'Papercuts', 'Eggs',
-    'Mooni', 'Gaami', 'War', 'Spirit', 'Faith', 'Glory', 'Blood', 'Empires',
-    'Songs', 'Dawn', 'Prophecy', 'Gold', 'Fire', 'Swords', 'Queens',
-    'Knights', 'Kings', 'Tribes', 'Tales', 'Quests', 'Change', 'Games',
-    'Throne', 'Conquest', 'Struggle', 'Victory', 'Battles', 'Legends',
-    'Heroes', 'Storms', 'Clouds', 'Gods', 'Love', 'Lords', 'Lights', 'Wrath',
-    'Destruction', 'Whales', 'Ruins', 'Monuments', 'Wonder'
-]
-SUPERLATIVES = [
-    'Epic', 'Endless', 'Glorious', 'Brave', 'Misty', 'Mysterious', 'Lost',
-    'Cold', 'Amazing', 'Doomed', 'Glowing', 'Glimmering', 'Magical', 'Living',
-    'Thriving', 'Bold', 'Dark', 'Bright', 'Majestic', 'Shimmering', 'Lucky',
-    'Great', 'Everlasting', 'Eternal', 'Superb', 'Frozen', 'Gruffy', 'Slimy',
-    'Silly', 'Unwilling', 'Stumbling', 'Drunken', 'Merry', 'Mediocre',
-    'Normal', 'Stupid', 'Moody', 'Tipsy', 'Trifling', 'Rancid', 'Numb'
-]
-NATURES = [
-    'Hills', 'Fields', 'Lands', 'Forest', 'Ocean', 'Fruit', 'Mountain', 'Lake',
-    'Paradise', 'Jungle', 'Desert', 'River', 'Sea', 'Shores', 'Valley',
-    'Garden', 'Moon', 'Star', 'Winter', 'Spring', 'Summer', 'Autumn',
-    'Divide', 'Square', 'Glacier', 'Ice', 'Custard', 'Goon', 'Cat',
-    'Spagetti', 'Fish', 'Fame', 'Popcorn', 'Dessert', 'Space'
+from polycore import gamenames
+
+from . import roles
+
+
+LANGUAGE = gamenames.LANGUAGE
+# Bell boys is the only component with a space in, but we store it with a
+# dash instead since we use spaces to split up components.
+ACTIONS = frozenset(
+    action.replace(' ', '-')
+    for action in (*gamenames.CRAZY_ACTIONS, *gamenames.ACTIONS)
+)
+SUPERLATIVES = frozenset(
+    (*gamenames.CRAZY_SUPERLATIVES, *gamenames.SUPERLATIVES)
+)
+NATURES = frozenset((*gamenames.CRAZY_NATURES, *gamenames.NATURES))
+
+DIVISION_CHANNELS = [
+    'time-out-glitches-and-breaks', 'general',
+    *['game-' + str(i) for i in range(1, 9)]
 ]
+RESET_TOPIC = 'https://www.youtube.com/watch?v=oHg5SJYRHA0'
+FOLLOW_UP_CATEGORY_ID = 749979803150712965
+FOLLOW_UP_CHANNELS = ['breaks', 'kick-out-on-sight', 'penalties']
+EXTRA_ROLE_IDS = [685862261150973994, 754208236734906379, 751867341809254402]
+
+MAX_CONCURRENT_CHANNEL_CHANGES = 5
+# Rough figures for how long Discord's rate limits make each channel change
+# or role removal take on average, used to estimate how long a reset takes.
+CHANNEL_OPERATION_SECONDS = 0.5
+ROLE_OPERATION_SECONDS = 0.2
 
 
 def _is_renameable(channel: discord.TextChannel) -> bool:
@@ -96,59 +95,149 @@ async def rename(channel: discord.TextChannel, new_name: str) -> str:
     return 'Channel renamed :thumbsup:'
 
 
+class CategoryReset(typing.NamedTuple):
+    """A category to empty, and the channels to create in it afterwards."""
+
+    category: discord.CategoryChannel
+    names: typing.List[str]
+    overwrites: typing.Dict[typing.Any, discord.PermissionOverwrite]
+    topic: str
+
+
+class ResetPlan:
+    """Every channel and role change needed to reset some categories.
+
+    Categories are reset concurrently, as are the deletions (and then the
+    creations) within each category. Role clears run alongside them.
+    """
+
+    def __init__(self):
+        """Start with an empty plan."""
+        self.categories: typing.List[CategoryReset] = []
+        self.roles: typing.List[discord.Role] = []
+
+    def add_category(
+            self, category: discord.CategoryChannel,
+            names: typing.List[str], topic: str = ''):
+        """Plan to replace a category's channels with new ones.
+
+        The new channels copy the permissions of the current first channel.
+        """
+        overwrites = category.text_channels[0].overwrites
+        self.categories.append(
+            CategoryReset(category, names, overwrites, topic)
+        )
+
+    def add_role(self, role: discord.Role):
+        """Plan to remove a role from everyone who has it."""
+        self.roles.append(role)
+
+    @property
+    def channel_operations(self) -> int:
+        """Count the channels to delete and create."""
+        return sum(
+            len(reset.category.channels) + len(reset.names)
+            for reset in self.categories
+        )
+
+    @property
+    def role_operations(self) -> int:
+        """Count the role removals."""
+        return sum(len(role.members) for role in self.roles)
+
+    @property
+    def estimated_duration(self) -> float:
+        """Roughly estimate how many seconds the reset will take."""
+        return max(
+            self.channel_operations * CHANNEL_OPERATION_SECONDS,
+            self.role_operations * ROLE_OPERATION_SECONDS
+        )
+
+    def describe(self) -> str:
+        """Describe the plan without carrying it out."""
+        return (
+            f'Would reset {len(self.categories)} categories and clear '
+            f'{len(self.roles)} roles: {self.channel_operations} channel '
+            f'changes and {self.role_operations} role changes, taking '
+            f'about {self.estimated_duration:.0f} seconds.'
+        )
+
+    async def _limited(self, request: typing.Awaitable) -> typing.Any:
+        """Make a request, limiting how many are made at once."""
+        async with self.semaphore:
+            return await request
+
+    async def _reset_category(self, reset: CategoryReset):
+        """Delete a category's channels, then create the new ones."""
+        await asyncio.gather(*(
+            self._limited(channel.delete())
+            for channel in reset.category.channels
+        ))
+        await asyncio.gather(*(
+            self._limited(reset.category.create_text_channel(
+                name, overwrites=reset.overwrites, topic=reset.topic,
+                position=position
+            )) for position, name in enumerate(reset.names)
+        ))
+
+    async def execute(self) -> typing.List[roles.RoleReport]:
+        """Carry out the plan, and get a report for each role cleared."""
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHANNEL_CHANGES)
+        results = await asyncio.gather(
+            *map(self._reset_category, self.categories),
+            *map(roles.mass_un_role, self.roles)
+        )
+        return list(results[len(self.categories):])
+
+
+def _is_division(category: discord.CategoryChannel) -> bool:
+    """Check if a category is a division category."""
+    return bool(category.text_channels) and _is_renameable(
+        category.text_channels[0]
+    )
+
+
 async def reset(
         channel: discord.TextChannel, any_channel: bool = False,
-        topic: str = '') -> str:
+        topic: str = '', dry_run: bool = False) -> str:
     """Reset all channels in a category."""
     if not (any_channel or _is_renameable(channel)):
         return 'This is not a division category!'
-    overwrites = channel.overwrites
-    category = channel.category
-    for channel in category.channels:
-        await channel.delete()
-    new_names = [
-        'time-out-glitches-and-breaks', 'general',
-        *['game-' + str(i) for i in range(1, 9)]
-    ]
-    for name in new_names:
-        await category.create_text_channel(
-            name, overwrites=overwrites, topic=topic
-        )
+    plan = ResetPlan()
+    plan.add_category(channel.category, DIVISION_CHANNELS, topic)
+    if dry_run:
+        return plan.describe()
+    await plan.execute()
+
+
+def plan_guild_reset(guild: discord.Guild) -> ResetPlan:
+    """Plan the reset of all division categories and some other things."""
+    plan = ResetPlan()
+    for category in guild.categories:
+        if _is_division(category):
+            plan.add_category(category, DIVISION_CHANNELS, RESET_TOPIC)
+            role = discord.utils.get(
+                guild.roles, name=f'Division {category}'
+            )
+            if role:
+                plan.add_role(role)
+    follow_up_category = guild.get_channel(FOLLOW_UP_CATEGORY_ID)
+    plan.add_category(follow_up_category, FOLLOW_UP_CHANNELS)
+    for role_id in EXTRA_ROLE_IDS:
+        if role := guild.get_role(role_id):
+            plan.add_role(role)
+    return plan
 
 
-async def reset_guild(guild: discord.Guild) -> str:
+async def reset_guild(guild: discord.Guild, dry_run: bool = False) -> str:
     """Reset all division categories, and some other channels/roles."""
-    cat_count = 0
-    role_count = 0
-    # In case guild.categories changes during iteration.
-    categories = list(guild.categories)
-    for cat in categories:
-        if cat.text_channels:
-            # reset will return error if not division cat, no need to check.
-            error = await reset(
-                cat.text_channels[0],
-                topic='https://www.youtube.com/watch?v=oHg5SJYRHA0'
-            )
-            if not error:
-                role = discord.utils.get(guild.roles, name=f'Division {cat}')
-                if role:
-                    await mass_un_role(role)
-                    role_count += 1
-                cat_count += 1
-    follow_up_cat = guild.get_channel(749979803150712965)
-    overwrites = follow_up_cat.text_channels[0].overwrites
-    for channel in follow_up_cat.channels:
-        await channel.delete()
-    new_names = ['breaks', 'kick-out-on-sight', 'penalties']
-    for name in new_names:
-        await follow_up_cat.create_text_channel(name, overwrites=overwrites)
-    extra_roles = [685862261150973994, 754208236734906379, 751867341809254402]
-    for role_id in extra_roles:
-        role = guild.get_role(role_id)
-        if not role:
-            continue
-        await mass_un_role(role)
+    plan = plan_guild_reset(guild)
+    if dry_run:
+        return plan.describe()
+    reports = await plan.execute()
+    failed = sum(len(report.failed) for report in reports)
     return (
-        f'Reset {cat_count} division categories, {role_count} division '
-        f'roles, the FOLLOW-UP category and {len(extra_roles)} extra roles.'
+        f'Reset {len(plan.categories) - 1} division categories, the '
+        f'FOLLOW-UP category and {len(plan.roles)} roles '
+        f'({failed} role removals failed).'
     )
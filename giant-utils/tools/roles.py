@@ -1,16 +1,168 @@
-"""Utility for mass adding of roles."""
-import discord
+"""Utility for mass adding of roles.
 
+Role changes are run concurrently, up to a limit. If Discord still rate
+limits a change, it is retried after the delay Discord asks for. A failed
+change doesn't stop the others: failures are collected into a report.
+"""
+import asyncio
+import io
+import time
 import typing
 
+import discord
+
+
+MAX_CONCURRENT = 5
+MAX_ATTEMPTS = 3
+PROGRESS_INTERVAL = 3    # Seconds.
+MAX_LISTED_FAILURES = 20    # More than this are sent as a file instead.
+MAX_ERROR_LENGTH = 50    # Characters, so the report fits in one message.
+
+
+class Progress(typing.NamedTuple):
+    """How far through a mass role operation we are."""
+
+    done: int
+    total: int
+    rate: float    # Members per second.
+
+    @property
+    def eta(self) -> float:
+        """Estimate the number of seconds left."""
+        if not self.rate:
+            return 0
+        return (self.total - self.done) / self.rate
+
+    def __str__(self) -> str:
+        """Describe the progress in a human-readable way."""
+        if not self.rate:
+            return f'{self.done}/{self.total} members.'
+        return (
+            f'{self.done}/{self.total} members, {self.rate:.1f} per second, '
+            f'about {self.eta:.0f}s left.'
+        )
+
+
+class RoleReport(typing.NamedTuple):
+    """The result of a mass role operation."""
+
+    done: int
+    failed: typing.List[typing.Tuple[discord.Member, Exception]]
+
+    def __str__(self) -> str:
+        """Summarise the report in a human-readable way."""
+        if not self.failed:
+            return f'Done for {self.done} members :thumbsup:'
+        lines = [
+            f'Done for {self.done} members, failed for {len(self.failed)}:'
+        ]
+        for member, error in self.failed[:MAX_LISTED_FAILURES]:
+            reason = _describe(error)
+            if len(reason) > MAX_ERROR_LENGTH:
+                reason = reason[:MAX_ERROR_LENGTH - 1] + '…'
+            lines.append(f'- {member.display_name}: {reason}')
+        if len(self.failed) > MAX_LISTED_FAILURES:
+            lines.append(
+                f'… and {len(self.failed) - MAX_LISTED_FAILURES} more '
+                '(see the attached file).'
+            )
+        return '\n'.join(lines)
+
+    def file(self) -> typing.Optional[discord.File]:
+        """Get every failure as a file, if too many to list in a message."""
+        if len(self.failed) <= MAX_LISTED_FAILURES:
+            return None
+        lines = (
+            f'{member.id} {member}: {_describe(error)}\n'
+            for member, error in self.failed
+        )
+        data = io.BytesIO(''.join(lines).encode())
+        return discord.File(data, filename='failed.txt')
+
+
+def _describe(error: Exception) -> str:
+    """Get a short description of why a role change failed."""
+    return getattr(error, 'text', None) or str(error)
+
+
+ProgressCallback = typing.Callable[[Progress], typing.Awaitable[None]]
+RoleAction = typing.Callable[[discord.Member], typing.Awaitable[None]]
+
+
+def _retry_after(error: discord.HTTPException) -> float:
+    """Get how long Discord asked us to wait before retrying."""
+    try:
+        return float(error.response.headers.get('Retry-After', 1))
+    except (AttributeError, TypeError, ValueError):
+        return 1
+
+
+async def _attempt(action: RoleAction, member: discord.Member):
+    """Apply a role change, retrying if rate limited."""
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            await action(member)
+            return
+        except discord.HTTPException as error:
+            if error.status != 429 or attempt == MAX_ATTEMPTS:
+                raise
+            await asyncio.sleep(_retry_after(error))
+
+
+async def _schedule(
+        members: typing.List[discord.Member], action: RoleAction,
+        on_progress: typing.Optional[ProgressCallback] = None
+        ) -> RoleReport:
+    """Apply a role change to many members concurrently."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT)
+    start = time.monotonic()
+    done = 0
+    failed = []
+
+    def progress() -> Progress:
+        elapsed = time.monotonic() - start
+        return Progress(done, len(members), done / elapsed if elapsed else 0)
+
+    async def run(member: discord.Member):
+        nonlocal done
+        async with semaphore:
+            try:
+                await _attempt(action, member)
+            except discord.HTTPException as error:
+                failed.append((member, error))
+        done += 1
+
+    async def report():
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            await on_progress(progress())
+
+    if on_progress:
+        reporter = asyncio.create_task(report())
+    try:
+        await asyncio.gather(*map(run, members))
+    finally:
+        if on_progress:
+            reporter.cancel()
+    return RoleReport(done - len(failed), failed)
+
 
-async def mass_role(role: discord.Role, members: typing.List[discord.Member]):
+async def mass_role(
+        role: discord.Role, members: typing.List[discord.Member],
+        on_progress: typing.Optional[ProgressCallback] = None
+        ) -> RoleReport:
     """Award a role to a list of people."""
-    for member in members:
-        await member.add_roles(role)
+    return await _schedule(
+        list(members), lambda member: member.add_roles(role), on_progress
+    )
 
 
-async def mass_un_role(role: discord.Role):
+async def mass_un_role(
+        role: discord.Role,
+        on_progress: typing.Optional[ProgressCallback] = None
+        ) -> RoleReport:
     """Remove a role from everyone who has it."""
-    for member in role.members:
-        await member.remove_roles(role)
+    return await _schedule(
+        list(role.members), lambda member: member.remove_roles(role),
+        on_progress
+    )
@@ -1,5 +1,6 @@
 """Tools to view and search for rules."""
 import json
+import pathlib
 import re
 import typing
 
@@ -11,7 +12,7 @@ from . import menus
 
 def load_data() -> tuple[dict[str, str], dict[str, str], dict[str, str]]:
     """Load the rules from JSON and index the categories."""
-    with open('rules.json') as f:
+    with open(pathlib.Path(__file__).parent.parent / 'rules.json') as f:
         data = json.load(f)
     rules = data['rules']
     categories = data['categories']
@@ -0,0 +1,26 @@
+"""Code shared by the Polytopia bots.
+
+Submodules are imported the first time they are used, so a bot only pays
+for the parts it needs. Every bot in a process shares the same modules, and
+so the same copy of the static tables (tribes, game name words, colours).
+"""
+import importlib
+from types import ModuleType
+
+
+__all__ = [
+    'checks', 'colours', 'ctx_logs', 'db', 'errors', 'gamenames', 'helpcmd',
+    'lru', 'provision', 'runner', 'schedule', 'timezones', 'tribes'
+]
+
+
+def __getattr__(name: str) -> ModuleType:
+    """Import a submodule when it is first used."""
+    if name not in __all__:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return importlib.import_module(f'.{name}', __name__)
+
+
+def __dir__() -> list[str]:
+    """List the submodules, including those not imported yet."""
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,5 @@
+"""Run several bots in one process."""
+from .runner import main
+
+
+main()
@@ -0,0 +1,13 @@
+"""Discord.py command checks."""
+from typing import Callable, Iterable
+
+from discord.ext import commands
+
+
+def admin_check(role_ids: Iterable[int]) -> Callable:
+    """Make a check for the bot owner, channel managers or some roles."""
+    return commands.check_any(
+        commands.is_owner(),
+        commands.has_guild_permissions(manage_channels=True),
+        commands.has_any_role(*role_ids)
+    )
@@ -0,0 +1,102 @@
+"""Tools for using a SQLite database from the event loop, with Peewee.
+
+Queries block, so coroutines should run them with `read` or `write`. Writes
+are serialised through a single writer thread, while reads are spread over
+a small pool of reader threads. Peewee gives each thread its own
+connection, and WAL mode means that reads don't wait for writes.
+"""
+import asyncio
+import concurrent.futures
+import functools
+from typing import Any, Callable
+
+import peewee
+
+
+READER_THREADS = 3
+
+
+class AsyncSqliteDatabase(peewee.SqliteDatabase):
+    """A SQLite database with its own reader and writer threads."""
+
+    def __init__(
+            self, *args: Any, reader_threads: int = READER_THREADS,
+            **kwargs: Any):
+        """Set up the database, and the threads to run queries on."""
+        super().__init__(*args, **kwargs)
+        self._writer = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='db-writer'
+        )
+        self._readers = concurrent.futures.ThreadPoolExecutor(
+            max_workers=reader_threads, thread_name_prefix='db-reader'
+        )
+
+    def _atomic(self, function: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Call a function in a transaction."""
+        with self.atomic():
+            return function(*args, **kwargs)
+
+    async def read(self, function: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Call a function which reads from the database on a reader thread."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._readers, functools.partial(function, *args, **kwargs)
+        )
+
+    async def write(
+            self, function: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Call a function which writes to the database on the writer thread.
+
+        The function is run in a transaction.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._writer,
+            functools.partial(self._atomic, function, *args, **kwargs)
+        )
+
+
+class AsyncModel(peewee.Model):
+    """Base model adding awaitable queries, for an AsyncSqliteDatabase."""
+
+    @classmethod
+    async def aget_or_none(cls, *query: Any, **filters: Any) -> Any:
+        """Awaitable version of get_or_none."""
+        return await cls._meta.database.read(
+            cls.get_or_none, *query, **filters
+        )
+
+    @classmethod
+    async def acreate(cls, **data: Any) -> Any:
+        """Awaitable version of create."""
+        return await cls._meta.database.write(cls.create, **data)
+
+    async def asave(self, *args: Any, **kwargs: Any) -> int:
+        """Awaitable version of save."""
+        return await self._meta.database.write(self.save, *args, **kwargs)
+
+    async def adelete_instance(self, *args: Any, **kwargs: Any) -> int:
+        """Awaitable version of delete_instance."""
+        return await self._meta.database.write(
+            self.delete_instance, *args, **kwargs
+        )
+
+
+def backfill(
+        query: peewee.ModelSelect, apply: Callable[[list], None],
+        chunk_size: int = 500) -> int:
+    """Call a function on the rows of a query, a chunk at a time.
+
+    This keeps memory use down when filling in data for a large table. Rows
+    are fetched in primary key order, each chunk starting after the last
+    key of the one before, so every chunk is an index seek. The query must
+    select the primary key. Returns the number of rows.
+    """
+    primary_key = query.model._meta.primary_key
+    query = query.order_by(primary_key).limit(chunk_size)
+    chunk = list(query)
+    total = 0
+    while chunk:
+        apply(chunk)
+        total += len(chunk)
+        last_key = getattr(chunk[-1], primary_key.name)
+        chunk = list(query.where(primary_key > last_key))
+    return total
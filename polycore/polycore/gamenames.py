@@ -0,0 +1,52 @@
+"""The words that game names are made from.
+
+Names follow one of the templates, with each part filled in from the
+matching list, and the place made of syllables from the game's language.
+The crazy lists are for sillier names.
+"""
+
+
+LANGUAGE = (
+    'po', 'ly', 'lu', 'mi', 'lo', 'da', 'bi', 'oo', 'sa', 'ko', 'me', 'da',
+    'to', 'pi', 'as', 'an', 'ki'
+)
+TEMPLATES = (
+    '[action] of [place]', '[nature] of [place]', '[place]ian [action]',
+    '[place]ian [nature]', '[super] [action]', 'The [nature] of [action]',
+    'The [super] [nature]', '[nature] & [action]'
+)
+ACTIONS = (
+    'War', 'Spirit', 'Faith', 'Glory', 'Blood', 'Empires', 'Songs', 'Dawn',
+    'Prophecy', 'Gold', 'Fire', 'Swords', 'Queens', 'Knights', 'Kings',
+    'Tribes', 'Tales', 'Quests', 'Change', 'Games', 'Throne', 'Conquest',
+    'Struggle', 'Victory', 'Battles', 'Legends', 'Heroes', 'Storms', 'Clouds',
+    'Gods', 'Love', 'Lords', 'Lights', 'Wrath', 'Destruction', 'Whales',
+    'Ruins', 'Monuments', 'Wonder'
+)
+CRAZY_ACTIONS = (
+    'Clowns', 'Bongo', 'Duh!', 'Squeal', 'Squirrel', 'Confusion', 'Gruff',
+    'Moan', 'Chickens', 'Spunge', 'Gnomes', 'Bell boys', 'Gurkins',
+    'Commotion', 'LOL', 'Shenanigans', 'Hullabaloo', 'Papercuts', 'Eggs',
+    'Mooni', 'Gaami'
+)
+SUPERLATIVES = (
+    'Epic', 'Endless', 'Glorious', 'Brave', 'Misty', 'Mysterious', 'Lost',
+    'Cold', 'Amazing', 'Doomed', 'Glowing', 'Glimmering', 'Magical', 'Living',
+    'Thriving', 'Bold', 'Dark', 'Bright', 'Majestic', 'Shimmering', 'Lucky',
+    'Great', 'Everlasting', 'Eternal', 'Superb', 'Frozen'
+)
+CRAZY_SUPERLATIVES = (
+    'Gruffy', 'Slimy', 'Silly', 'Unwilling', 'Stumbling', 'Drunken', 'Merry',
+    'Mediocre', 'Normal', 'Stupid', 'Moody', 'Tipsy', 'Trifling', 'Rancid',
+    'Numb'
+)
+NATURES = (
+    'Hills', 'Fields', 'Lands', 'Forest', 'Ocean', 'Fruit', 'Mountain', 'Lake',
+    'Paradise', 'Jungle', 'Desert', 'River', 'Sea', 'Shores', 'Valley',
+    'Garden', 'Moon', 'Star', 'Winter', 'Spring', 'Summer', 'Autumn', 'Divide',
+    'Square', 'Glacier', 'Ice'
+)
+CRAZY_NATURES = (
+    'Custard', 'Goon', 'Cat', 'Spagetti', 'Fish', 'Fame', 'Popcorn', 'Dessert',
+    'Space'
+)
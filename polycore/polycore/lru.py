@@ -0,0 +1,55 @@
+"""A bounded cache which discards the least recently used entries."""
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LRUCache:
+    """A mapping which holds a limited number of entries.
+
+    When it is full, adding an entry discards the entry which was used
+    longest ago. Lookups are counted, to see how well the cache works.
+    """
+
+    def __init__(self, size: int):
+        """Set up an empty cache of a given size."""
+        self.size = size
+        self.entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Count the entries in the cache."""
+        return len(self.entries)
+
+    def get(self, key: Hashable) -> Any:
+        """Get an entry, or None if it isn't cached."""
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def peek(self, key: Hashable) -> Any:
+        """Get an entry without counting it as a lookup or a use."""
+        return self.entries.get(key)
+
+    def put(self, key: Hashable, value: Any):
+        """Add or replace an entry."""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def discard(self, key: Hashable):
+        """Remove an entry, if it is cached."""
+        self.entries.pop(key, None)
+
+    def __str__(self) -> str:
+        """Summarise the cache's use in a human-readable way."""
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0
+        return (
+            f'{len(self)}/{self.size} entries, {self.hits} hits, '
+            f'{self.misses} misses ({rate:.0%} hit rate).'
+        )
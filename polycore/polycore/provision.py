@@ -0,0 +1,60 @@
+"""Create a set of Discord objects concurrently, respecting dependencies.
+
+Each step names the steps it depends on, and steps are run a level at a
+time: every step whose dependencies are done is run concurrently with the
+others. discord.py waits out the rate limit of each route itself, and a
+semaphore stops too many requests from being queued at once.
+"""
+import asyncio
+from collections import namedtuple
+from typing import Any, Awaitable, Callable
+
+
+# `requires` is a tuple of step names, and `create` is a coroutine function
+# which is passed a dict of the results of the steps done so far.
+Step = namedtuple('Step', ['requires', 'create'])
+
+MAX_CONCURRENT = 5
+
+
+async def provision(
+        steps: dict[str, Step],
+        done: dict[str, Any],
+        on_done: Callable[[str, Any], Awaitable[None]]) -> dict[str, Any]:
+    """Run any steps not already done, and return the results of every step.
+
+    `done` maps the names of steps done by an earlier attempt to their
+    results, so that those steps are skipped. `on_done` is called with the
+    name and result of each step as it finishes, so that progress can be
+    recorded. If any step fails, the first error is raised once the rest of
+    its level has finished.
+    """
+    results = dict(done)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT)
+
+    async def run(name: str) -> Any:
+        async with semaphore:
+            return await steps[name].create(results)
+
+    while pending := [name for name in steps if name not in results]:
+        ready = [
+            name for name in pending
+            if all(required in results for required in steps[name].requires)
+        ]
+        if not ready:
+            raise ValueError(f'Unsatisfiable steps: {", ".join(pending)}.')
+        outcomes = await asyncio.gather(
+            *map(run, ready), return_exceptions=True
+        )
+        errors = []
+        for name, outcome in zip(ready, outcomes):
+            # A cancelled step gives a CancelledError, which isn't an
+            # Exception.
+            if isinstance(outcome, BaseException):
+                errors.append(outcome)
+            else:
+                results[name] = outcome
+                await on_done(name, outcome)
+        if errors:
+            raise errors[0]
+    return results
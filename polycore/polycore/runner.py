@@ -0,0 +1,96 @@
+"""Run several bots in one process, sharing one event loop.
+
+Each bot lives in its own folder, with an entry module that defines a
+`create_bot()` function and a `TOKEN`. The bots use the same top level
+module names (`main`, `cogs`, `bot`...), so each bot's modules are removed
+from `sys.modules` once it has been created. The bot keeps the modules it
+loaded alive, so this only means the next bot gets its own copies.
+
+Example: `python -m polycore diplo-bot survive-the-square:bot.__main__`
+"""
+import argparse
+import asyncio
+import importlib
+import logging
+import pathlib
+import sys
+from typing import NamedTuple
+
+from discord.ext import commands
+
+
+DEFAULT_ENTRY = 'bot'
+
+
+class LoadedBot(NamedTuple):
+    """A bot created by its entry module, ready to start."""
+
+    bot: commands.Bot
+    token: str
+
+
+def _forget_modules(path: pathlib.Path):
+    """Remove every module imported from a folder from the module cache."""
+    names = []
+    for name, module in sys.modules.items():
+        # Namespace packages (folders without an __init__.py) have no file,
+        # only a search path.
+        file = getattr(module, '__file__', None)
+        locations = [file] if file else list(getattr(module, '__path__', []))
+        if locations and all(
+                pathlib.Path(location).resolve().is_relative_to(path)
+                for location in locations):
+            names.append(name)
+    # A namespace package's search path breaks once its parent is removed,
+    # so only remove modules once they have all been found.
+    for name in names:
+        del sys.modules[name]
+
+
+def load(path: str, entry: str = DEFAULT_ENTRY) -> LoadedBot:
+    """Create the bot in a folder using its entry module."""
+    path = pathlib.Path(path).resolve()
+    sys.path.insert(0, str(path))
+    try:
+        module = importlib.import_module(entry)
+        return LoadedBot(module.create_bot(), module.TOKEN)
+    finally:
+        sys.path.remove(str(path))
+        _forget_modules(path)
+
+
+def run(bots: list[LoadedBot]):
+    """Run some bots until they are all stopped."""
+    loop = asyncio.get_event_loop()
+    try:
+        loop.run_until_complete(asyncio.gather(
+            *(loaded.bot.start(loaded.token) for loaded in bots)
+        ))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(asyncio.gather(
+            *(loaded.bot.close() for loaded in bots)
+        ))
+        loop.close()
+
+
+def main():
+    """Load and run the bots given on the command line."""
+    parser = argparse.ArgumentParser(
+        prog='polycore', description='Run several bots in one process.'
+    )
+    parser.add_argument(
+        'bots', nargs='+', metavar='path[:entry]',
+        help=(
+            'The folder a bot is in, and optionally the module to create it '
+            f'from (default {DEFAULT_ENTRY}).'
+        )
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    bots = []
+    for spec in args.bots:
+        path, _, entry = spec.partition(':')
+        bots.append(load(path, entry or DEFAULT_ENTRY))
+    run(bots)
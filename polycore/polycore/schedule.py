@@ -0,0 +1,169 @@
+"""An index of when the players in each game are awake.
+
+The day is split into 96 quarter hour slots, in UTC. A player counts as
+awake from 8am to 10pm in their timezone. For each game, we keep the number
+of players awake in each slot and the windows when the most players are
+awake, so viewing a game's schedule doesn't need any work. A game's schedule
+is built the first time it is needed, and then updated as players join or
+leave and change their timezones.
+
+Each bot keeps its own ScheduleIndex, since game IDs are only unique
+within one bot.
+"""
+from __future__ import annotations
+
+import datetime
+import itertools
+from collections import namedtuple
+from typing import Optional
+
+
+SLOTS = 96
+SLOT_LENGTH = datetime.timedelta(minutes=15)
+DAY_START = 8 * 4    # Slots after local midnight.
+DAY_LENGTH = 14 * 4
+
+# `start` and `end` are slots. A window may wrap around midnight, in which
+# case `end` is less than `start`.
+Window = namedtuple('Window', ['start', 'end', 'awake'])
+
+
+def first_slot(offset: datetime.timedelta) -> int:
+    """Get the slot in which the day starts for a UTC offset."""
+    return (DAY_START - offset // SLOT_LENGTH) % SLOTS
+
+
+def format_slot(slot: int) -> str:
+    """Display the time a slot starts at."""
+    return f'{slot // 4:02}:{slot % 4 * 15:02}'
+
+
+def format_window(window: Window) -> str:
+    """Display the times a window starts and ends at."""
+    if window.start == window.end:
+        return 'all day'
+    return f'{format_slot(window.start)}-{format_slot(window.end)} UTC'
+
+
+class Schedule:
+    """The number of players in a game who are awake at each time of day."""
+
+    def __init__(self, offsets: dict[int, Optional[datetime.timedelta]]):
+        """Count the players awake in each slot, given their UTC offsets.
+
+        Players with an offset of None haven't set their timezone, and
+        aren't counted.
+        """
+        self.offsets = dict(offsets)
+        # Sweep over the changes at the start and end of each player's day.
+        changes = [0] * (SLOTS + 1)
+        for offset in self.offsets.values():
+            if offset is not None:
+                start = first_slot(offset)
+                end = start + DAY_LENGTH
+                changes[start] += 1
+                if end > SLOTS:
+                    changes[0] += 1
+                    end -= SLOTS
+                changes[end] -= 1
+        self.counts = list(itertools.accumulate(changes[:SLOTS]))
+        self.windows = self.find_windows()
+
+    @property
+    def unknown(self) -> int:
+        """Count the players who haven't set their timezone."""
+        return sum(offset is None for offset in self.offsets.values())
+
+    def shift(self, offset: Optional[datetime.timedelta], change: int):
+        """Add to the count of players awake in each slot of someone's day."""
+        if offset is None:
+            return
+        start = first_slot(offset)
+        for slot in range(start, start + DAY_LENGTH):
+            self.counts[slot % SLOTS] += change
+
+    def update(self, player_id: int, offset: Optional[datetime.timedelta]):
+        """Add a player to the schedule, or change their UTC offset."""
+        self.shift(self.offsets.get(player_id), -1)
+        self.offsets[player_id] = offset
+        self.shift(offset, 1)
+        self.windows = self.find_windows()
+
+    def discard(self, player_id: int):
+        """Remove a player from the schedule, if they are in it."""
+        if player_id in self.offsets:
+            self.shift(self.offsets.pop(player_id), -1)
+            self.windows = self.find_windows()
+
+    def find_windows(self) -> list[Window]:
+        """Find the windows when the most players are awake, longest first."""
+        awake = max(self.counts)
+        if not awake:
+            return []
+        if min(self.counts) == awake:
+            return [Window(0, 0, awake)]
+        # Start from a slot outside every window, so none are split.
+        origin = self.counts.index(min(self.counts))
+        windows = []
+        start = None
+        for index in range(origin + 1, origin + SLOTS + 1):
+            slot = index % SLOTS
+            if self.counts[slot] == awake and start is None:
+                start = slot
+            elif self.counts[slot] != awake and start is not None:
+                windows.append(Window(start, slot, awake))
+                start = None
+        return sorted(
+            windows, key=lambda window: -((window.end - window.start) % SLOTS)
+        )
+
+
+class ScheduleIndex:
+    """The schedules of a bot's games, kept up to date as players change."""
+
+    def __init__(self):
+        """Set up an empty index."""
+        # Game ID -> the schedule for that game.
+        self.schedules: dict[int, Schedule] = {}
+        # Player ID -> the IDs of the games they are in with a schedule.
+        self.player_games: dict[int, set[int]] = {}
+
+    def get(self, game_id: int) -> Optional[Schedule]:
+        """Get the schedule for a game, if it is loaded."""
+        return self.schedules.get(game_id)
+
+    def load(
+            self, game_id: int,
+            offsets: dict[int, Optional[datetime.timedelta]]) -> Schedule:
+        """Build and store the schedule for a game's players."""
+        self.forget(game_id)
+        schedule = self.schedules[game_id] = Schedule(offsets)
+        for player_id in offsets:
+            self.player_games.setdefault(player_id, set()).add(game_id)
+        return schedule
+
+    def join(
+            self, game_id: int, player_id: int,
+            offset: Optional[datetime.timedelta]):
+        """Add a player to a game's schedule, if it is loaded."""
+        if schedule := self.schedules.get(game_id):
+            schedule.update(player_id, offset)
+            self.player_games.setdefault(player_id, set()).add(game_id)
+
+    def leave(self, game_id: int, player_id: int):
+        """Remove a player from a game's schedule, if it is loaded."""
+        if schedule := self.schedules.get(game_id):
+            schedule.discard(player_id)
+            self.player_games.get(player_id, set()).discard(game_id)
+
+    def set_offset(
+            self, player_id: int, offset: Optional[datetime.timedelta]):
+        """Update the schedules of a player's games for a new timezone."""
+        for game_id in self.player_games.get(player_id, ()):
+            self.schedules[game_id].update(player_id, offset)
+
+    def forget(self, game_id: int):
+        """Discard the schedule for a game, eg. after it is deleted."""
+        if schedule := self.schedules.pop(game_id, None):
+            for player_id in schedule.offsets:
+                self.player_games[player_id].discard(game_id)
@@ -0,0 +1,136 @@
+"""Tool for parsing, displaying and storing timezones."""
+from __future__ import annotations
+
+import datetime
+import functools
+import re
+
+from discord.ext import commands
+
+import peewee
+
+
+PARSE_CACHE_SIZE = 128
+
+# GMT or UTC alone, or an offset in hours (optionally with minutes or a
+# decimal fraction of an hour), optionally prefixed with GMT or UTC.
+TIMEZONE_FORMAT = re.compile(
+    r'(?:UTC|GMT)|(?:UTC|GMT)?([+-]?)([0-9]+)(?::([0-5][0-9])|\.([0-9]+))?'
+)
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse(argument: str) -> Timezone:
+    """Parse a UTC offset, eg. "UTC+5", "-1.5" or "GMT+2:30"."""
+    match = TIMEZONE_FORMAT.fullmatch(argument.upper())
+    if not match:
+        raise commands.BadArgument('Unrecognised timezone format.')
+    sign, raw_hours, raw_minutes, fraction = match.groups()
+    if raw_hours is None:
+        return Timezone(False, 0, 0)
+    hours = int(raw_hours)
+    if raw_minutes:
+        minutes = int(raw_minutes)
+    elif fraction:
+        minutes = round(float('0.' + fraction) * 60)
+    else:
+        minutes = 0
+    if hours > 24:
+        raise commands.BadArgument('Offset more than UTC+24.')
+    if minutes % 15:
+        raise commands.BadArgument(
+            'Offset minute part must be a multiple of 15 minutes.'
+        )
+    return Timezone(sign == '-', hours, minutes)
+
+
+class Timezone:
+    """Type to store a timezone and display it in various ways.
+
+    Timezones are immutable and hashable, and equal if they have the same
+    offset.
+    """
+
+    __slots__ = ('negative', 'hours', 'minutes')
+
+    @classmethod
+    async def convert(cls, ctx: commands.Context, argument: str) -> Timezone:
+        """Parse a Discord.py argument as a UTC offset."""
+        return parse(argument)
+
+    def __init__(self, negative: bool, hours: int, minutes: int):
+        """Store the values that make up the UTC offset."""
+        object.__setattr__(self, 'negative', negative)
+        object.__setattr__(self, 'hours', hours)
+        object.__setattr__(self, 'minutes', minutes)
+
+    def __setattr__(self, name: str, value: object):
+        """Prevent the timezone being changed, since it may be shared."""
+        raise AttributeError('Timezones are immutable.')
+
+    def __eq__(self, other: object) -> bool:
+        """Check if two timezones have the same offset."""
+        if isinstance(other, Timezone):
+            return self.timedelta == other.timedelta
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        """Hash the timezone by its offset."""
+        return hash(self.timedelta)
+
+    def __repr__(self) -> str:
+        """Represent the timezone for debugging."""
+        return f'<Timezone {self}>'
+
+    def __str__(self) -> str:
+        """Display the offset in a human-readable format."""
+        sign = '-' if self.negative else '+'
+        return f'UTC{sign}{self.hours}:{self.minutes:>02}'
+
+    @property
+    def timedelta(self) -> datetime.timedelta:
+        """Get the offset as a timedelta, for easy comparison."""
+        factor = -1 if self.negative else 1
+        return datetime.timedelta(
+            hours=factor * self.hours, minutes=factor * self.minutes
+        )
+
+
+class TimezoneField(peewee.Field):
+    """Database field that stores a timezone (UTC offset).
+
+    Stores offsets as an SQLite tinyint (1 byte) as follows (most to least
+    significant bits):
+    0      - Always a low bit.
+    1      - Low if the offset is below zero, high otherwise.
+    2 to 5 - The whole hour offset (a 4 bit integer).
+    6      - If high, add 30 minutes to the offset.
+    7      - If high, add 15 minutes to the offset.
+    """
+
+    field_type = 'tinyint'    # 1 byte
+
+    def db_value(self, timezone: Timezone) -> int:
+        """Convert a timezone to a 7 bit number."""
+        if timezone is None:
+            return
+        value = 0
+        if timezone.negative:
+            value |= 1 << 7
+        value |= timezone.hours << 2
+        value |= timezone.minutes // 15
+        return value
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def python_value(value: int) -> Timezone:
+        """Convert a 7 bit number to a timezone.
+
+        There are few possible values, so each timezone is only created once.
+        """
+        if value is None:
+            return
+        negative = bool(value & (1 << 7))
+        hours = (value & 0b111100) >> 2
+        minutes = 15 * (value & 0b11)
+        return Timezone(negative, hours, minutes)
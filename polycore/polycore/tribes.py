@@ -0,0 +1,241 @@
+"""Tools for storing, displaying and parsing lists of tribes."""
+from __future__ import annotations
+
+import enum
+import re
+from typing import Iterable, Iterator, Optional, Union
+
+from discord.ext import commands
+
+import peewee
+
+
+class Tribe(enum.Enum):
+    """An enum for each in-game tribe."""
+
+    AI_MO = enum.auto()
+    XIN_XI = enum.auto()
+    OUMAJI = enum.auto()
+    BARDUR = enum.auto()
+    VENGIR = enum.auto()
+    ZEBASI = enum.auto()
+    KICKOO = enum.auto()
+    YADAKK = enum.auto()
+    CYMANTI = enum.auto()
+    ELYRION = enum.auto()
+    POLARIS = enum.auto()
+    LUXIDOOR = enum.auto()
+    HOODRICK = enum.auto()
+    QUETZALI = enum.auto()
+    IMPERIUS = enum.auto()
+    AQUARION = enum.auto()
+
+    @classmethod
+    async def convert(cls, ctx: commands.Context, raw_argument: str) -> Tribe:
+        """Convert a Discord.py argument to a tribe."""
+        argument = NON_LATIN.sub(
+            '', raw_argument.translate(SPECIAL_LETTERS).upper()
+        )
+        if not argument:
+            raise commands.BadArgument(
+                'Please use latin characters to specify a tribe.'
+            )
+        if argument not in PREFIXES:
+            raise commands.BadArgument(
+                f'No tribe found matching `{raw_argument}`.'
+            )
+        if not (tribe := PREFIXES[argument]):
+            raise commands.BadArgument(
+                f'Multiple tribes found matching `{raw_argument}`, try using '
+                'more letters.'
+            )
+        return tribe
+
+    @property
+    def bit(self) -> int:
+        """Get the bit flag representing the tribe in a TribeList."""
+        return 1 << self.value
+
+    def emoji(self, emoji_ids: dict[str, int]) -> str:
+        """Get the emoji representing the tribe.
+
+        `emoji_ids` maps tribe names (lowercase, hyphenated) to the IDs of
+        custom emojis.
+        """
+        emoji_id = emoji_ids.get(self.name.lower().replace('_', '-'))
+        if emoji_id:
+            return f'<:{self.name}:{emoji_id}>'
+        return ':interrobang:'
+
+    def __str__(self) -> str:
+        """Get the name of the tribe."""
+        return self.name.title().replace('_', '-')
+
+
+# Letters from some tribes' names in their in-game fonts, for converting.
+SPECIAL_LETTERS = str.maketrans('∑∫ỹȱŋă', 'elyrna')
+NON_LATIN = re.compile('[^A-Z]')
+
+
+def _build_prefixes() -> dict[str, Optional[Tribe]]:
+    """Map every prefix of a tribe name to the tribe it could be.
+
+    Prefixes shared by more than one tribe map to None.
+    """
+    prefixes = {}
+    for tribe in Tribe:
+        name = tribe.name.replace('_', '')
+        for end in range(1, len(name) + 1):
+            prefix = name[:end]
+            prefixes[prefix] = None if prefix in prefixes else tribe
+    return prefixes
+
+
+PREFIXES = _build_prefixes()
+
+
+class TribeList:
+    """A list of tribes that allows updating with += and -=.
+
+    The tribes are stored as bit flags in an integer, in the same format as
+    in the database. Also acts as a Discord.py converter for a list of
+    tribes. It is better than commands.Greedy for our use case because it
+    errors if any tribe is invalid (but this also means no arguments can
+    come after it).
+    """
+
+    @classmethod
+    async def convert(
+            cls, ctx: commands.Context, raw_argument: str) -> TribeList:
+        """Convert a Discord.py argument to a TribeList."""
+        tribes = []
+        raw_tribes = raw_argument.split(' ')
+        for raw_tribe in raw_tribes:
+            if raw_tribe.lower() == 'all':
+                return cls(Tribe)
+            tribe = await Tribe.convert(ctx, raw_tribe)
+            tribes.append(tribe)
+        return cls(tribes)
+
+    @classmethod
+    def from_mask(cls, mask: int) -> TribeList:
+        """Get the list of tribes represented by some bit flags."""
+        tribes = cls()
+        tribes.mask = mask
+        return tribes
+
+    @staticmethod
+    def to_mask(tribes: Union[Tribe, Iterable[Tribe]]) -> int:
+        """Get the bit flags representing a tribe or tribes."""
+        if isinstance(tribes, Tribe):
+            return tribes.bit
+        if isinstance(tribes, TribeList):
+            return tribes.mask
+        mask = 0
+        for tribe in tribes:
+            mask |= tribe.bit
+        return mask
+
+    def __init__(self, tribes: Iterable[Tribe] = ()):
+        """Store the list of tribes."""
+        self.mask = self.to_mask(tribes)
+
+    @property
+    def tribes(self) -> tuple[Tribe]:
+        """Get the tribes in the list, in the order they are defined."""
+        return tuple(tribe for tribe in Tribe if self.mask & tribe.bit)
+
+    def __str__(self) -> str:
+        """Represent the list as a human-readable string."""
+        return ', '.join(map(str, self.tribes))
+
+    def emojis(self, emoji_ids: dict[str, int]) -> str:
+        """Represent the list as emojis (see Tribe.emoji)."""
+        return ' '.join(tribe.emoji(emoji_ids) for tribe in self.tribes)
+
+    def __iadd__(self, other: Union[Tribe, Iterable[Tribe]]) -> TribeList:
+        """Add a tribe or tribes to the list."""
+        return TribeList.from_mask(self.mask | self.to_mask(other))
+
+    def __isub__(self, other: Union[Tribe, Iterable[Tribe]]) -> TribeList:
+        """Remove a tribe or tribes from the list."""
+        return TribeList.from_mask(self.mask & ~self.to_mask(other))
+
+    def __contains__(self, tribe: Tribe) -> bool:
+        """Check if a tribe is in the list."""
+        return bool(self.mask & tribe.bit)
+
+    def __len__(self) -> int:
+        """Count the tribes in the list."""
+        return bin(self.mask).count('1')
+
+    def __eq__(self, other: object) -> bool:
+        """Check if two lists have the same tribes."""
+        if isinstance(other, TribeList):
+            return self.mask == other.mask
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        """Hash the list by its tribes."""
+        return hash(self.mask)
+
+    def __iter__(self) -> Iterator[Tribe]:
+        """Get the list of tribes, for iterating over."""
+        return iter(self.tribes)
+
+
+class TribeListField(peewee.Field):
+    """A field to store a list of tribes."""
+
+    field_type = 'smallint'    # 2 bytes
+
+    def db_value(self, tribes: Iterable[Tribe]) -> int:
+        """Convert a list of tribe enum instances to a series of bit flags."""
+        return TribeList.to_mask(tribes)
+
+    def python_value(self, value: int) -> TribeList:
+        """Convert a series of bit flags to a list of tribe enum instances."""
+        return TribeList.from_mask(value)
+
+    def contains_all(
+            self, tribes: Union[Tribe, Iterable[Tribe]]) -> peewee.Expression:
+        """Make a query expression checking for every one of some tribes."""
+        mask = TribeList.to_mask(tribes)
+        return self.bin_and(TribeList.from_mask(mask)) == mask
+
+    def contains_any(
+            self, tribes: Union[Tribe, Iterable[Tribe]]) -> peewee.Expression:
+        """Make a query expression checking for any one of some tribes."""
+        mask = TribeList.to_mask(tribes)
+        return self.bin_and(TribeList.from_mask(mask)) != 0
+
+    def count_owners(self) -> list[peewee.Expression]:
+        """Make aggregate expressions counting the owners of each tribe."""
+        return [peewee.fn.SUM(self.bin_and(tribe) != 0) for tribe in Tribe]
+
+
+def assign_tribes(owned: dict[int, TribeList]) -> dict[int, Optional[Tribe]]:
+    """Give as many players as possible a different tribe which they own.
+
+    `owned` maps each player's ID to the tribes they own. Players that can't
+    be given a tribe get None.
+    """
+    holders: dict[Tribe, int] = {}
+
+    def place(player: int, tried: set[Tribe]) -> bool:
+        # Take a free tribe, or one whose holder can be moved to another.
+        for tribe in owned[player]:
+            if tribe not in tried:
+                tried.add(tribe)
+                if tribe not in holders or place(holders[tribe], tried):
+                    holders[tribe] = player
+                    return True
+        return False
+
+    # Players with fewer tribes go first, since they have less choice.
+    for player in sorted(owned, key=lambda player: len(owned[player])):
+        place(player, set())
+    assigned = dict.fromkeys(owned)
+    for tribe, player in holders.items():
+        assigned[player] = tribe
+    return assigned
@@ -0,0 +1,11 @@
+"""Install the code shared by the bots."""
+from setuptools import setup
+
+
+setup(
+    name='polycore',
+    version='0.1.0',
+    packages=['polycore'],
+    python_requires='>=3.9',
+    install_requires=['discord.py', 'peewee']
+)
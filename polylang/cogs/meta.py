@@ -1,7 +1,7 @@
 import discord.ext.commands as commands
 import discord
 import os
-from utils.colours import colours
+from polycore.colours import NAMED as colours
 from utils.paginator import FieldPaginator as Paginator
 import json
 
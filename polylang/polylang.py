@@ -1,23 +1,27 @@
 import logging
-import platform
+import pathlib
 from bot import PolyLang
 import sys
 
 
-with open('config/TOKEN') as f:
+with open(pathlib.Path(__file__).parent / 'config' / 'TOKEN') as f:
     key = f.read().strip()
 
 pre = ';'
 token = key
 test = False
 
-logging.basicConfig(level=logging.INFO)
+TOKEN = token
+
+
+def create_bot(cogs=[]):
+    return PolyLang(prefix=pre, test=test, cogs=cogs)
 
 
 def run(cogs=[]):
-    bot = PolyLang(prefix=pre, test=test, cogs=cogs)
-    bot.run(token)
+    create_bot(cogs).run(token)
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
     run(sys.argv[1:])
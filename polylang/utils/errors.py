@@ -1,6 +1,6 @@
 import discord
 from discord.ext import commands
-from utils.colours import colours
+from polycore.colours import NAMED as colours
 import datetime as dt
 
 
@@ -1,17 +1,21 @@
 import re
 import datetime
+import pathlib
+
+
+LOG_PATH = pathlib.Path(__file__).parent.parent / 'data' / 'logs.txt'
 
 
 def log(message, level):
     tstamp = datetime.datetime.now().strftime('%d/%m/%y %H:%M')
-    with open('data/logs.txt', 'a') as f:
+    with open(LOG_PATH, 'a') as f:
         f.write(f'{tstamp} [{level.upper():^7}] {message}\n')
 
 
 def fetch(level=None):
     lines = []
     try:
-        with open('data/logs.txt') as f:
+        with open(LOG_PATH) as f:
             for i in f:
                 if i.strip():
                     if not level:
@@ -1,4 +1,4 @@
-from utils.colours import colours
+from polycore.colours import NAMED as colours
 import random
 import discord
 
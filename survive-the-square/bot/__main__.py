@@ -1,15 +1,34 @@
-"""The main bot."""
+"""The main bot.
+
+Run with `python -m bot`, or alongside other bots with `python -m polycore`.
+"""
 import logging
 
+import discord
 from discord.ext import commands
+from polycore import ctx_logs, helpcmd
+
+from .main import config
+
 
-from .main import config, ctx_logs, helpcmd
+TOKEN = config.TOKEN
 
 
-logging.basicConfig(level=logging.INFO)
+def create_bot() -> commands.Bot:
+    """Create the bot and load its cogs."""
+    # The members intent keeps the member cache (used to search game members
+    # by name) complete and up to date.
+    intents = discord.Intents.default()
+    intents.members = True
+    bot = commands.Bot(
+        command_prefix=config.PREFIX, help_command=helpcmd.Help(),
+        intents=intents
+    )
+    ctx_logs.setup(bot)
+    bot.load_extension('bot.cogs')
+    return bot
 
-bot = commands.Bot(command_prefix=config.PREFIX, help_command=helpcmd.Help())
-ctx_logs.setup(bot)
-bot.load_extension('bot.cogs')
 
-bot.run(config.TOKEN)
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    create_bot().run(TOKEN)
@@ -1,17 +1,57 @@
 """Commands for manging an in progress game."""
+from typing import Optional
+
+import aiohttp
 import discord
 from discord.ext import commands
 
-from ..main import checks
-from ..models import Game, GameMember
+from ..main import attachments, checks, names, teardown
+from ..main.webhooks import WebhookCache
+from ..models import Game, GameMember, schedules
 
 
 class Games(commands.Cog):
     """Commands for managing an in progress game."""
 
     def __init__(self, bot: commands.Bot):
-        """Store a reference to the bot."""
+        """Store a reference to the bot and set up the webhook cache."""
         self.bot = bot
+        self.webhooks = WebhookCache(bot)
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def cog_unload(self):
+        """Close the HTTP session used for webhooks and attachments."""
+        if self.session:
+            self.bot.loop.create_task(self.session.close())
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Get the HTTP session used for webhooks and attachments."""
+        if not self.session:
+            self.session = aiohttp.ClientSession()
+        return self.session
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Load the stored webhooks into the cache."""
+        await self.webhooks.warm(self.get_session())
+
+    @commands.Cog.listener()
+    async def on_webhooks_update(self, channel: discord.abc.GuildChannel):
+        """Forget the cached webhook for a channel if it was deleted."""
+        await self.webhooks.check(channel)
+
+    @commands.Cog.listener()
+    async def on_member_update(
+            self, before: discord.Member, after: discord.Member):
+        """Keep the index of game member names up to date."""
+        names.update_member(after)
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        """Keep the index of game member names up to date."""
+        for guild in self.bot.guilds:
+            if member := guild.get_member(after.id):
+                names.update_member(member)
 
     @commands.command(brief='Message another player.', aliases=['m'])
     async def message(
@@ -21,20 +61,23 @@ class Games(commands.Cog):
         Example: `{{pre}}m artemis This is my message.`
         """
         dest = ctx.guild.get_channel(player.channel_id)
-        webhook = None
-        for existing_webhook in await dest.webhooks():
-            if existing_webhook.user.id == self.bot.user.id:
-                webhook = existing_webhook
-        webhook = webhook or await dest.create_webhook(name='Messaging System')
-        await webhook.send(
-            content=message,
-            username=ctx.author.display_name,
-            avatar_url=str(ctx.author.avatar),
-            files=[
-                await attachment.to_file()
-                for attachment in ctx.message.attachments
-            ]
-        )
+
+        async def relay(webhook: discord.Webhook):
+            await webhook.send(
+                content=message,
+                username=ctx.author.display_name,
+                avatar_url=str(ctx.author.avatar),
+                files=await attachments.download_all(
+                    self.get_session(), ctx.message.attachments
+                )
+            )
+
+        try:
+            await relay(await self.webhooks.get(dest))
+        except discord.NotFound:
+            # The webhook was deleted without us noticing.
+            await self.webhooks.forget(dest.id)
+            await relay(await self.webhooks.get(dest))
         await ctx.message.add_reaction(u'\u2705')    # Check mark.
 
     @commands.command(brief='Observe a game.', aliases=['o'])
@@ -43,7 +86,7 @@ class Games(commands.Cog):
 
         Example: `{{pre}}observe 12`
         """
-        member = GameMember.get_or_none(
+        member = await GameMember.aget_or_none(
             GameMember.game_id == game.id,
             GameMember.player_id == ctx.author.id
         )
@@ -57,50 +100,80 @@ class Games(commands.Cog):
         await ctx.author.add_roles(role)
         await ctx.send('Gave you the role.')
 
-    @commands.command(brief='Archive a game.')
+    async def tear_down(
+            self, ctx: commands.Context, games: list[Game], archive: bool):
+        """Archive or delete several games at once, reporting progress."""
+        verb = 'Archiving' if archive else 'Deleting'
+        summary = f'{verb} {len(games)} game{"s" * (len(games) != 1)}'
+        progress = await ctx.send(f'{summary}...')
+
+        async def report(done: int, total: int):
+            await progress.edit(content=f'{summary}: {done}/{total} done.')
+
+        batch = teardown.Teardown(report)
+        for game in games:
+            await game.load_roster()
+            roles = [
+                teardown.delete_role(role_id, ctx.guild)
+                for role_id in game.role_ids
+            ]
+            if archive:
+                channels = [
+                    teardown.archive_channel(channel_id, ctx.guild)
+                    for channel_id in game.channel_ids
+                    if channel_id != game.category_id
+                ]
+                channels.append(
+                    teardown.archive_category(game.category_id, ctx.guild)
+                )
+            else:
+                channels = [
+                    teardown.delete_channel(channel_id, ctx.guild)
+                    for channel_id in game.channel_ids
+                ]
+            batch.add(game.id, roles + channels)
+        failures = await batch.run()
+        for game in games:
+            if errors := failures.get(game.id):
+                ctx.logger.log(
+                    f'Error: {len(errors)} changes to {game.name} failed '
+                    f'({errors[0]}). Run the command again to retry them.'
+                )
+            else:
+                # Also deletes the game's members, in the same transaction.
+                await game.adelete_instance(recursive=True)
+                names.forget_game(ctx.guild.id, game.id)
+                schedules.forget(game.id)
+        done = len(games) - len(failures)
+        action = 'archived' if archive else 'deleted'
+        await ctx.send(f'{done}/{len(games)} games {action}.')
+
+    @commands.command(brief='Archive games.')
     @checks.admin
-    async def archive(self, ctx: commands.Context, game: Game):
-        """Archive a game's channels.
+    async def archive(
+            self, ctx: commands.Context, games: commands.Greedy[Game]):
+        """Archive the channels of one or more games.
 
-        Example: `{{pre}}archive 3`
+        Examples:
+        `{{pre}}archive 3`
+        `{{pre}}archive 3 4 5`
         """
+        if not games:
+            raise commands.BadArgument('No games specified.')
         async with ctx.typing():
-            for role_id in game.role_ids:
-                role = ctx.guild.get_role(role_id)
-                if role:
-                    await role.delete()
-            for channel_id in game.channel_ids:
-                channel = ctx.guild.get_channel(channel_id)
-                if channel:
-                    await channel.edit(
-                        overwrites={
-                            ctx.guild.default_role: discord.PermissionOverwrite(
-                                read_messages=False, send_messages=False
-                            )
-                        }
-                    )
-            category = ctx.guild.get_channel(game.category_id)
-            await category.edit(name=category.name + ' - Archived')
-            GameMember.delete().where(GameMember.game == game).execute()
-            game.delete_instance()
-        await ctx.send('Game archived.')
-
-    @commands.command(brief='Delete a game.')
+            await self.tear_down(ctx, games, archive=True)
+
+    @commands.command(brief='Delete games.')
     @checks.admin
-    async def delete(self, ctx: commands.Context, game: Game):
-        """Delete a game and it's channels.
+    async def delete(
+            self, ctx: commands.Context, games: commands.Greedy[Game]):
+        """Delete one or more games and their channels.
 
-        Example: `{{pre}}delete 3`
+        Examples:
+        `{{pre}}delete 3`
+        `{{pre}}delete 3 4 5`
         """
+        if not games:
+            raise commands.BadArgument('No games specified.')
         async with ctx.typing():
-            for channel_id in game.channel_ids:
-                channel = ctx.guild.get_channel(channel_id)
-                if channel:
-                    await channel.delete()
-            for role_id in game.role_ids:
-                role = ctx.guild.get_role(role_id)
-                if role:
-                    await role.delete()
-            GameMember.delete().where(GameMember.game == game).execute()
-            game.delete_instance()
-        await ctx.send('Game deleted.')
+            await self.tear_down(ctx, games, archive=False)
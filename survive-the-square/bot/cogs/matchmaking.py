@@ -1,6 +1,7 @@
 """Commands for creating and viewing games."""
 import discord
 from discord.ext import commands
+from polycore import schedule
 
 from ..main import checks
 from .. import models
@@ -36,10 +37,58 @@ class Matchmaking(commands.Cog):
             )
             return
         async with ctx.typing():
-            game = models.Game.create(size=size, is_steam=is_steam)
-            await game.setup(ctx.guild)
+            game = await models.Game.acreate(
+                size=size, is_steam=is_steam
+            )
+            try:
+                await game.setup(ctx.guild)
+            except discord.HTTPException:
+                ctx.logger.log(
+                    f'Setting up {game.name} failed. Do '
+                    f'`{ctx.prefix}setup-game {game.id}` to try again.'
+                )
+                raise
         await ctx.send(f'Created game {game.id}.')
 
+    @commands.command(
+        brief='Finish setting up a game.', name='setup-game',
+        aliases=['setup']
+    )
+    @checks.admin
+    async def setup_game(self, ctx: commands.Context, game: models.Game):
+        """Create any roles or channels missing from a game.
+
+        Useful if creating a game failed part of the way through.
+
+        Example: `{{pre}}setup-game 12`
+        """
+        async with ctx.typing():
+            await game.setup(ctx.guild)
+        await ctx.send(f'Finished setting up {game.name}.')
+
+    @commands.command(
+        brief='Fix game member counts.', name='repair-counts',
+        aliases=['check-counts']
+    )
+    @checks.admin
+    async def repair_counts(self, ctx: commands.Context):
+        """Recount the members of every game, and fix any wrong counts.
+
+        The counts should always be right, so this is only needed if
+        something went wrong.
+
+        Example: `{{pre}}repair-counts`
+        """
+        async with ctx.typing():
+            repaired = await models.database.write(
+                models.Game.repair_member_counts
+            )
+        if repaired:
+            games = ', '.join(map(str, repaired))
+            await ctx.send(f'Fixed the member counts of games {games}.')
+        else:
+            await ctx.send('All member counts were already right.')
+
     @commands.command(
         brief='Join a game.', name='join-game', aliases=['j', 'join']
     )
@@ -109,7 +158,7 @@ class Matchmaking(commands.Cog):
         Example: `{{pre}}g 45`
         """
         if not game:
-            game = models.Game.get_or_none(
+            game = await models.Game.aget_or_none(
                 models.Game.category_id == ctx.channel.category_id
             )
             if not game:
@@ -118,6 +167,7 @@ class Matchmaking(commands.Cog):
                     'category.'
                 )
                 return
+        await game.load_roster()
         platform = 'Steam' if game.is_steam else 'Mobile'
         await ctx.send(embed=discord.Embed(
             title=game.name,
@@ -128,18 +178,87 @@ class Matchmaking(commands.Cog):
             colour=0xF58F29
         ).add_field(name='Players', value=game.player_list))
 
+    @commands.command(brief='See when players are awake.', aliases=['sc'])
+    async def schedule(
+            self, ctx: commands.Context, game: models.Game = None):
+        """See when the most players in a game are awake (8am to 10pm).
+
+        Defaults to the game category you use the command in, if any.
+
+        Example: `{{pre}}schedule 45`
+        """
+        if not game:
+            game = await models.Game.aget_or_none(
+                models.Game.category_id == ctx.channel.category_id
+            )
+            if not game:
+                await ctx.send(
+                    'No game specified and command not used in a game '
+                    'category.'
+                )
+                return
+        found = await game.load_schedule()
+        if found.windows:
+            awake = found.windows[0].awake
+            windows = '\n'.join(map(schedule.format_window, found.windows))
+            description = (
+                f'Most players awake ({awake}/{len(found.offsets)}):\n'
+                f'{windows}'
+            )
+        else:
+            description = 'No players with a timezone set.'
+        if found.unknown:
+            description += (
+                f'\n\n{found.unknown} players haven\'t set their timezone.'
+            )
+        await ctx.send(embed=discord.Embed(
+            title=f'Schedule for {game.name}',
+            description=description,
+            colour=0xF58F29
+        ))
+
+    @commands.command(
+        brief='Hand out tribes for a game.', name='assign-tribes',
+        aliases=['tribes']
+    )
+    async def assign_tribes(self, ctx: commands.Context, game: models.Game):
+        """Give each player in a game a different tribe that they own.
+
+        Example: `{{pre}}assign-tribes 12`
+        """
+        assigned = await models.database.read(game.assign_tribes)
+        if not assigned:
+            await ctx.send(f'{game.name} has no players yet.')
+            return
+        lines = []
+        for discord_id, tribe in assigned.items():
+            lines.append(f'<@{discord_id}> - {tribe or "*none left*"}')
+        counts = await models.database.read(game.tribe_counts)
+        unowned = ', '.join(
+            str(tribe) for tribe, count in counts.items() if not count
+        )
+        await ctx.send(embed=discord.Embed(
+            title=f'Tribes for {game.name}',
+            description='\n'.join(lines),
+            colour=0xF58F29
+        ).add_field(name='Owned by nobody', value=unowned or '*None*'))
+
     @commands.command(
         brief='View open games.', name='open-games', aliases=['games', 'gs']
     )
-    async def open_games(self, ctx: commands.Context):
-        """View a list of open games.
+    async def open_games(self, ctx: commands.Context, page: int = 1):
+        """View a list of open games, 20 to a page.
 
-        Example: `{{pre}}games`
+        Examples:
+        `{{pre}}games`
+        `{{pre}}games 2`
         """
         lines = []
-        for game in models.Game.select():
-            if game.member_count < game.space_count:
-                lines.append(
-                    f'Game `{game.id:>3}`, `{game.member_count:>2}` players.'
-                )
+        games = await models.database.read(models.Game.open_games, page)
+        for game in games:
+            lines.append(
+                f'Game `{game.game_id:>3}`, '
+                f'`{game.member_count:>2}/{game.capacity}` players. '
+                f'{game.platform} game.'
+            )
         await ctx.send('\n'.join(lines) or '*There\'s nothing here.*')
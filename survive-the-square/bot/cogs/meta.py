@@ -3,8 +3,10 @@ import datetime
 
 import discord
 from discord.ext import commands
+from polycore import errors
 
-from ..main import config, errors
+from ..main import checks, config
+from ..models.players import player_cache
 
 
 ABOUT = 'A bot to manage Survive the Square games.'
@@ -63,3 +65,11 @@ class Meta(commands.Cog):
             f'\nResponse time: `{response_time}ms`'
             f'\nResponse roundtrip: `{roundtrip_time}ms`'
         ))
+
+    @commands.command(
+        brief='View cache statistics.', name='cache-stats', hidden=True
+    )
+    @checks.admin
+    async def cache_stats(self, ctx: commands.Context):
+        """See how well the player cache is working."""
+        await ctx.send(f'Player cache: {player_cache}')
@@ -4,7 +4,9 @@ import typing
 import discord
 from discord.ext import commands
 
-from ..models import GameMember, Player, Timezone, TribeList
+from ..models import (
+    GameMember, Player, Timezone, TribeList, database, schedules
+)
 
 
 class Players(commands.Cog):
@@ -25,10 +27,10 @@ class Players(commands.Cog):
         `{{pre}}p`
         """
         user = user or ctx.author
-        player = Player.get_player(user.id)
-        games = len(GameMember.select().where(
+        player = await Player.aget_player(user.id)
+        games = await database.read(GameMember.select().where(
             GameMember.player == player
-        ))
+        ).count)
         tz = player.utc_offset or 'Unknown'
         steam = player.steam_name or 'Unknown'
         mobile = player.mobile_name or 'Unkown'
@@ -54,9 +56,9 @@ class Players(commands.Cog):
         `{{pre}}add-tribes elyrion yad ven l k p`
         `{{pre}}at all`
         """
-        player = Player.get_player(ctx.author.id)
+        player = await Player.aget_player(ctx.author.id)
         player.tribes += tribes
-        player.save()
+        await player.asave()
         await ctx.send('Added to your tribes :thumbsup:')
 
     @commands.command(
@@ -68,9 +70,9 @@ class Players(commands.Cog):
 
         Example: `{{pre}}rt lux pol`
         """
-        player = Player.get_player(ctx.author.id)
+        player = await Player.aget_player(ctx.author.id)
         player.tribes -= tribes
-        player.save()
+        await player.asave()
         await ctx.send('Removed from your tribes :thumbsup:')
 
     @commands.command(
@@ -82,9 +84,9 @@ class Players(commands.Cog):
 
         Example: `{{pre}}mn artemisdev`
         """
-        player = Player.get_player(ctx.author.id)
+        player = await Player.aget_player(ctx.author.id)
         player.mobile_name = name
-        player.save()
+        await player.asave()
         await ctx.send('Updated your mobile name :thumbsup:')
 
     @commands.command(
@@ -96,9 +98,9 @@ class Players(commands.Cog):
 
         Example: `{{pre}}sn artemisdev`
         """
-        player = Player.get_player(ctx.author.id)
+        player = await Player.aget_player(ctx.author.id)
         player.steam_name = name
-        player.save()
+        await player.asave()
         await ctx.send('Updated your steam name :thumbsup:')
 
     @commands.command(
@@ -115,9 +117,10 @@ class Players(commands.Cog):
         `{{pre}}tz UTC+2:30`
         `{{pre}}tz -4`
         """
-        player = Player.get_player(ctx.author.id)
+        player = await Player.aget_player(ctx.author.id)
         player.utc_offset = timezone
-        player.save()
+        await player.asave()
+        schedules.set_offset(player.discord_id, player.utc_timedelta)
         await ctx.send('Updated your timezone :thumbsup:')
 
     @commands.command(
@@ -128,11 +131,7 @@ class Players(commands.Cog):
 
         Example: `{{pre}}search artemisdev`
         """
-        search = in_game_name.lower()
-        matches = list(Player.select().where(
-            (Player.mobile_name ** f'%{search}%')
-            | (Player.steam_name ** f'%{search}%')
-        ))
+        matches = await database.read(Player.search_names, in_game_name)
         if not matches:
             await ctx.send(
                 f'No player found by in-game name `{in_game_name}`.'
@@ -141,10 +140,10 @@ class Players(commands.Cog):
         lines = []
         for match in matches:
             name_matches = []
-            if match.mobile_name and search in match.mobile_name.lower():
-                name_matches.append(f'**{match.mobile_name}** (mobile)')
-            if match.steam_name and search in match.steam_name.lower():
-                name_matches.append(f'**{match.steam_name}** (steam)')
+            if match.mobile_name:
+                name_matches.append(f'{match.mobile_name} (mobile)')
+            if match.steam_name:
+                name_matches.append(f'{match.steam_name} (steam)')
             names = ' or '.join(name_matches)
             lines.append(
                 f'<@{match.discord_id}> - {names}')
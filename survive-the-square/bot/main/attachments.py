@@ -0,0 +1,68 @@
+"""Download message attachments so they can be forwarded.
+
+Attachments are streamed in chunks, and any bigger than a configured size
+are written to a temporary file rather than kept in memory. A shared
+semaphore limits how many attachments are downloaded at once.
+"""
+import asyncio
+import io
+import tempfile
+from typing import Optional
+
+import aiohttp
+import discord
+
+from . import config
+
+
+CHUNK_SIZE = 64 * 1024
+
+_downloads: Optional[asyncio.Semaphore] = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Get the semaphore limiting concurrent downloads."""
+    global _downloads
+    if not _downloads:
+        _downloads = asyncio.Semaphore(config.ATTACHMENT_DOWNLOADS)
+    return _downloads
+
+
+async def download(
+        session: aiohttp.ClientSession,
+        attachment: discord.Attachment) -> discord.File:
+    """Download an attachment to an in-memory or temporary file."""
+    if attachment.size > config.ATTACHMENT_SPOOL_SIZE:
+        file = tempfile.TemporaryFile()
+    else:
+        file = io.BytesIO()
+    try:
+        async with _get_semaphore():
+            async with session.get(attachment.url) as response:
+                response.raise_for_status()
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    file.write(chunk)
+    except BaseException:
+        file.close()
+        raise
+    file.seek(0)
+    return discord.File(
+        file, filename=attachment.filename, spoiler=attachment.is_spoiler()
+    )
+
+
+async def download_all(
+        session: aiohttp.ClientSession,
+        attachments: list[discord.Attachment]) -> list[discord.File]:
+    """Download several attachments concurrently."""
+    results = await asyncio.gather(
+        *(download(session, attachment) for attachment in attachments),
+        return_exceptions=True
+    )
+    files = [result for result in results if isinstance(result, discord.File)]
+    for result in results:
+        if isinstance(result, BaseException):
+            for file in files:
+                file.close()
+            raise result
+    return files
@@ -12,3 +12,9 @@ PREFIX = _data['prefix']
 TOKEN = _data['token']
 
 ADMIN_ROLE_IDS = _data.get('admin_roles', [])
+
+# Attachments bigger than this many bytes are spooled to a temporary file
+# while being forwarded, rather than being kept in memory.
+ATTACHMENT_SPOOL_SIZE = _data.get('attachment_spool_size', 1024 * 1024)
+# The maximum number of attachments to download at once.
+ATTACHMENT_DOWNLOADS = _data.get('attachment_downloads', 4)
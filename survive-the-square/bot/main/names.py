@@ -0,0 +1,120 @@
+"""An index of the names of game members, for finding members by name.
+
+Names are read from the gateway member cache, so searching them never needs
+an API request. If some members of a game aren't cached, they are requested
+from the gateway together, rather than fetched one by one.
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+from typing import Iterable
+
+import discord
+
+
+NON_ALPHANUMERIC = re.compile(r'[^a-z0-9]')
+
+# Guild ID -> game ID -> names of the members of that game.
+_guilds: dict[int, dict[int, GameNames]] = {}
+
+
+def normalise(name: str) -> str:
+    """Reduce a name to lowercase letters and numbers, for searching."""
+    return NON_ALPHANUMERIC.sub('', name.lower())
+
+
+class GameNames:
+    """The normalised names of each member of a game."""
+
+    def __init__(self, members: Iterable[discord.Member]):
+        """Index the names of some members."""
+        self.names: dict[int, tuple[str, ...]] = {}
+        self.exact: dict[str, set[int]] = {}
+        for member in members:
+            self.update(member)
+
+    def update(self, member: discord.Member):
+        """Add a member to the index, or update their names."""
+        self.discard(member.id)
+        names = tuple({normalise(member.display_name), normalise(member.name)})
+        self.names[member.id] = names
+        for name in names:
+            self.exact.setdefault(name, set()).add(member.id)
+
+    def discard(self, user_id: int):
+        """Remove a member from the index, if they are in it."""
+        for name in self.names.pop(user_id, ()):
+            self.exact[name].discard(user_id)
+            if not self.exact[name]:
+                del self.exact[name]
+
+    def search(self, search: str) -> list[int]:
+        """Get the IDs of the members matching a normalised search.
+
+        A member whose name is exactly the search is preferred over members
+        whose names only contain it.
+        """
+        if exact := self.exact.get(search):
+            return list(exact)
+        return [
+            user_id for user_id, names in self.names.items()
+            if any(search in name for name in names)
+        ]
+
+
+async def get_members(
+        guild: discord.Guild,
+        user_ids: list[int]) -> tuple[list[discord.Member], bool]:
+    """Get members from the cache, requesting any missing ones together.
+
+    Also returns whether every member was found. If a request times out,
+    the members it was for are left out.
+    """
+    members = []
+    missing = []
+    for user_id in user_ids:
+        if member := guild.get_member(user_id):
+            members.append(member)
+        else:
+            missing.append(user_id)
+    complete = True
+    # The gateway accepts at most 100 user IDs per request.
+    for start in range(0, len(missing), 100):
+        try:
+            members.extend(await guild.query_members(
+                user_ids=missing[start:start + 100], cache=True
+            ))
+        except asyncio.TimeoutError:
+            complete = False
+    return members, complete
+
+
+async def get_game_names(
+        guild: discord.Guild, game_id: int,
+        user_ids: list[int]) -> GameNames:
+    """Get the name index for a game, building it if necessary.
+
+    An index missing members whose request timed out is still returned,
+    but isn't kept, so that they are requested again next time.
+    """
+    games = _guilds.setdefault(guild.id, {})
+    if game_id in games:
+        return games[game_id]
+    members, complete = await get_members(guild, user_ids)
+    index = GameNames(members)
+    if complete:
+        games[game_id] = index
+    return index
+
+
+def forget_game(guild_id: int, game_id: int):
+    """Discard the name index for a game after its members have changed."""
+    _guilds.get(guild_id, {}).pop(game_id, None)
+
+
+def update_member(member: discord.Member):
+    """Update a member's names in the index of any game they are in."""
+    for game in _guilds.get(member.guild.id, {}).values():
+        if member.id in game.names:
+            game.update(member)
@@ -0,0 +1,166 @@
+"""Archive or delete the Discord roles and channels of several games at once.
+
+Every operation belongs to a rate limit bucket (role changes share one per
+guild, each channel has its own), and the number of requests running at
+once is limited per bucket as well as overall. discord.py waits out any
+rate limit it hits itself.
+
+Finished operations are recorded in a journal, so if a teardown fails part
+of the way through it can be run again without redoing them. The journal
+is only kept in memory, so it only saves repeating work within one process:
+after a restart everything is run again, which is safe because each
+operation tolerates what it acts on already being gone. A game's entries
+are taken out of the journal when it is added to a new batch, and only put
+back if it fails again.
+"""
+import asyncio
+from collections import namedtuple
+from typing import Awaitable, Callable, Optional
+
+import discord
+
+
+# `key` identifies the operation in the journal, `bucket` is its rate limit
+# bucket and `run` is a coroutine function that performs it.
+Operation = namedtuple('Operation', ['key', 'bucket', 'run'])
+
+MAX_CONCURRENT = 10
+BUCKET_LIMITS = {'roles': 2}
+DEFAULT_BUCKET_LIMIT = 2
+PROGRESS_INTERVAL = 2    # Seconds.
+
+ARCHIVED_PERMS = discord.PermissionOverwrite(
+    read_messages=False, send_messages=False
+)
+
+# Game ID -> keys of the operations done for it by a batch that failed.
+_journal: dict[int, set[tuple[str, int]]] = {}
+
+
+def delete_role(role_id: int, guild: discord.Guild) -> Operation:
+    """Make an operation that deletes a role, if it still exists."""
+    async def run():
+        if role := guild.get_role(role_id):
+            await role.delete()
+
+    return Operation(('delete', role_id), 'roles', run)
+
+
+def delete_channel(channel_id: int, guild: discord.Guild) -> Operation:
+    """Make an operation that deletes a channel, if it still exists."""
+    async def run():
+        if channel := guild.get_channel(channel_id):
+            await channel.delete()
+
+    return Operation(('delete', channel_id), f'channel:{channel_id}', run)
+
+
+def archive_channel(channel_id: int, guild: discord.Guild) -> Operation:
+    """Make an operation that hides a channel from everyone."""
+    async def run():
+        if channel := guild.get_channel(channel_id):
+            await channel.edit(overwrites={guild.default_role: ARCHIVED_PERMS})
+
+    return Operation(('archive', channel_id), f'channel:{channel_id}', run)
+
+
+def archive_category(category_id: int, guild: discord.Guild) -> Operation:
+    """Make an operation that hides and renames a category."""
+    async def run():
+        if category := guild.get_channel(category_id):
+            name = category.name
+            if not name.endswith(' - Archived'):
+                name += ' - Archived'
+            await category.edit(
+                name=name, overwrites={guild.default_role: ARCHIVED_PERMS}
+            )
+
+    return Operation(('archive', category_id), f'channel:{category_id}', run)
+
+
+class Teardown:
+    """A batch of operations on the roles and channels of several games."""
+
+    def __init__(
+            self,
+            on_progress: Optional[
+                Callable[[int, int], Awaitable[None]]] = None):
+        """Set up an empty batch.
+
+        `on_progress` is called every few seconds while the batch is
+        running, and once when it finishes, with the number of operations
+        done and the total number of operations.
+        """
+        self.on_progress = on_progress
+        self.operations: dict[int, list[Operation]] = {}
+        self.finished: dict[int, set[tuple[str, int]]] = {}
+        self.done = 0
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT)
+        self.buckets: dict[str, asyncio.Semaphore] = {}
+
+    def add(self, game_id: int, operations: list[Operation]):
+        """Add the operations for a game to the batch.
+
+        Operations already in the journal are skipped.
+        """
+        self.finished[game_id] = _journal.pop(game_id, set())
+        self.operations[game_id] = [
+            operation for operation in operations
+            if operation.key not in self.finished[game_id]
+        ]
+
+    @property
+    def total(self) -> int:
+        """Get the number of operations in the batch."""
+        return sum(map(len, self.operations.values()))
+
+    async def run_operation(self, game_id: int, operation: Operation):
+        """Run an operation, within the limits of its bucket."""
+        bucket = self.buckets.setdefault(operation.bucket, asyncio.Semaphore(
+            BUCKET_LIMITS.get(operation.bucket, DEFAULT_BUCKET_LIMIT)
+        ))
+        async with self.semaphore, bucket:
+            try:
+                await operation.run()
+            except discord.NotFound:
+                pass    # Already gone, which is fine.
+        self.finished[game_id].add(operation.key)
+        self.done += 1
+
+    async def report_progress(self):
+        """Call the progress callback regularly until cancelled."""
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            await self.on_progress(self.done, self.total)
+
+    async def run(self) -> dict[int, list[Exception]]:
+        """Run every operation, and get the errors for each failed game.
+
+        The operations done for games which failed are recorded in the
+        journal, to be skipped when they are tried again.
+        """
+        if self.on_progress:
+            reporter = asyncio.create_task(self.report_progress())
+        games = list(self.operations)
+        try:
+            results = await asyncio.gather(*(
+                asyncio.gather(*(
+                    self.run_operation(game_id, operation)
+                    for operation in self.operations[game_id]
+                ), return_exceptions=True) for game_id in games
+            ))
+        finally:
+            if self.on_progress:
+                reporter.cancel()
+        if self.on_progress:
+            await self.on_progress(self.done, self.total)
+        failures = {}
+        for game_id, game_results in zip(games, results):
+            errors = [
+                result for result in game_results
+                if isinstance(result, Exception)
+            ]
+            if errors:
+                failures[game_id] = errors
+                _journal[game_id] = self.finished[game_id]
+        return failures
@@ -0,0 +1,70 @@
+"""A cache of the webhooks used to relay messages to game members.
+
+Each webhook's URL is stored in the database next to the channel it belongs
+to, so the cache can be filled again at startup without any API requests.
+"""
+import aiohttp
+import discord
+from discord.ext import commands
+
+from ..models import GameMember, database
+
+
+class WebhookCache:
+    """The bot's webhook for each game member channel, by channel ID."""
+
+    def __init__(self, bot: commands.Bot):
+        """Set up the (empty) cache."""
+        self.bot = bot
+        self.webhooks: dict[int, discord.Webhook] = {}
+
+    async def warm(self, session: aiohttp.ClientSession):
+        """Fill the cache with the webhooks stored in the database."""
+        members = await database.read(list, GameMember.select(
+            GameMember.channel_id, GameMember.webhook_url
+        ).where(GameMember.webhook_url.is_null(False)))
+        for member in members:
+            self.webhooks[member.channel_id] = discord.Webhook.from_url(
+                member.webhook_url, session=session
+            )
+
+    async def get(self, channel: discord.TextChannel) -> discord.Webhook:
+        """Get the webhook for a channel, finding or creating it if needed."""
+        if webhook := self.webhooks.get(channel.id):
+            return webhook
+        for existing_webhook in await channel.webhooks():
+            if existing_webhook.user.id == self.bot.user.id:
+                webhook = existing_webhook
+        webhook = webhook or await channel.create_webhook(
+            name='Messaging System'
+        )
+        await database.write(GameMember.update(webhook_url=webhook.url).where(
+            GameMember.channel_id == channel.id
+        ).execute)
+        self.webhooks[channel.id] = webhook
+        return webhook
+
+    async def forget(self, channel_id: int):
+        """Discard the webhook for a channel, eg. because it was deleted."""
+        if self.webhooks.pop(channel_id, None):
+            await database.write(GameMember.update(webhook_url=None).where(
+                GameMember.channel_id == channel_id
+            ).execute)
+
+    async def check(self, channel: discord.TextChannel):
+        """Discard the webhook for a channel if it no longer exists.
+
+        Creating a webhook also changes the channel's webhooks, so a change
+        doesn't mean that the cached one was deleted.
+        """
+        if not (webhook := self.webhooks.get(channel.id)):
+            return
+        try:
+            existing = {
+                existing_webhook.id
+                for existing_webhook in await channel.webhooks()
+            }
+        except discord.HTTPException:
+            existing = set()
+        if webhook.id not in existing:
+            await self.forget(channel.id)
@@ -1,5 +1,7 @@
 """Re-export all the models."""
-from .games import Game, GameMember        # noqa:F401
-from .players import Player                # noqa:F401
-from .timezones import Timezone            # noqa:F401
-from .tribes import Tribe, TribeList       # noqa:F401
+from polycore.timezones import Timezone         # noqa:F401
+from polycore.tribes import Tribe, TribeList    # noqa:F401
+
+from . import database                          # noqa:F401
+from .games import Game, GameMember, schedules  # noqa:F401
+from .players import Player                     # noqa:F401
@@ -1,13 +1,31 @@
-"""Setup Peewee's connection to the database."""
+"""Setup Peewee's connection to the database.
+
+Queries block, so coroutines should run them with `read` or `write`, which
+run them on the database's own threads (see `polycore.db`).
+"""
+import datetime
+from typing import Iterable
+
 import peewee
+from polycore.db import AsyncModel, AsyncSqliteDatabase
 
 from ..main import config
 
 
-db = peewee.SqliteDatabase(str(config.BASE_PATH / 'db.sqlite3'))
+# The version of the latest migration. Tables are created up to date, so a
+# new database starts with every migration up to this one recorded as
+# applied. This must be updated whenever a migration is added.
+SCHEMA_VERSION = 5
+
+db = AsyncSqliteDatabase(
+    str(config.BASE_PATH / 'db.sqlite3'),
+    pragmas={'journal_mode': 'wal', 'synchronous': 'normal'}
+)
+read = db.read
+write = db.write
 
 
-class BaseModel(peewee.Model):
+class BaseModel(AsyncModel):
     """Base model to set default settings."""
 
     class Meta:
@@ -15,3 +33,25 @@ class BaseModel(peewee.Model):
 
         database = db
         use_legacy_table_names = False
+
+
+class AppliedMigration(BaseModel):
+    """A record of a migration having been applied to the database."""
+
+    version = peewee.IntegerField(primary_key=True)
+    applied_at = peewee.DateTimeField(default=datetime.datetime.utcnow)
+
+
+def create_tables(models: Iterable[type[BaseModel]]):
+    """Create the tables for some models, if they don't exist yet.
+
+    Existing tables are left alone: changes to them are made by migrations.
+    """
+    db.create_tables([model for model in models if not model.table_exists()])
+
+
+if not db.get_tables():
+    create_tables([AppliedMigration])
+    AppliedMigration.insert_many(
+        {'version': version} for version in range(1, SCHEMA_VERSION + 1)
+    ).execute()
@@ -1,22 +1,31 @@
 """Models relating to games."""
 from __future__ import annotations
 
-import re
+import datetime
 from collections import namedtuple
-from typing import Optional
+from typing import Any, Iterable, Iterator, Optional, Union
 
 import discord
 from discord.ext import commands
 
-from peewee import fn, BooleanField, ForeignKeyField, IntegerField
+from peewee import (
+    fn, BooleanField, ForeignKeyField, IntegerField, IntegrityError,
+    ModelSelect, TextField
+)
+from polycore import provision, schedule
+from polycore.tribes import assign_tribes, Tribe
 
-from .database import db, BaseModel
+from ..main import names
+from .database import create_tables, read, write, BaseModel
 from .players import Player
 
 
 UserData = namedtuple('UserData', [
     'name', 'possesive', 'to_be', 'to_have', 'user'
 ])
+OpenGame = namedtuple('OpenGame', [
+    'game_id', 'member_count', 'capacity', 'platform'
+])
 
 NO_PERMS = discord.PermissionOverwrite(
     read_messages=False, send_messages=False
@@ -28,6 +37,9 @@ WRITE_PERMS = discord.PermissionOverwrite(
     read_messages=True, send_messages=True
 )
 
+# When the players in each game are awake.
+schedules = schedule.ScheduleIndex()
+
 
 class Game(BaseModel):
     """Model representing a game."""
@@ -43,6 +55,12 @@ class Game(BaseModel):
     side_2_role_id = IntegerField(null=True)
     side_1_channel_id = IntegerField(null=True)
     side_2_channel_id = IntegerField(null=True)
+    # Kept up to date as members join and leave, so they needn't be counted.
+    member_count = IntegerField(default=0)
+    side_1_count = IntegerField(default=0)
+    side_2_count = IntegerField(default=0)
+
+    _roster: Optional[Roster] = None
 
     @classmethod
     async def convert(cls, ctx: commands.Context, raw_argument: str) -> Game:
@@ -53,11 +71,26 @@ class Game(BaseModel):
             raise commands.BadArgument(
                 f'Invalid game ID `{raw_argument}` (not a number).'
             )
-        game = cls.get_or_none(cls.id == game_id)
+        game = await cls.aget_or_none(cls.id == game_id)
         if not game:
             raise commands.BadArgument(f'Game {game_id} not found.')
         return game
 
+    @classmethod
+    def open_games(cls, page: int = 1, per_page: int = 20) -> list[OpenGame]:
+        """Get a page of the games that still have spaces available."""
+        capacity = cls.size * 2
+        query = cls.select(
+            cls.id, cls.member_count, capacity, cls.is_steam
+        ).where(
+            cls.member_count < capacity
+        ).order_by(cls.id).paginate(page, per_page).tuples()
+        return [
+            OpenGame(
+                game_id, count, spaces, 'Steam' if is_steam else 'Mobile'
+            ) for game_id, count, spaces, is_steam in query
+        ]
+
     @property
     def name(self) -> str:
         """Get the game's displayable name."""
@@ -72,9 +105,133 @@ class Game(BaseModel):
         return self.size * 2
 
     @property
-    def member_count(self) -> int:
-        """Count the members in the game."""
-        return GameMember.select().where(GameMember.game == self).count()
+    def roster(self) -> Roster:
+        """Get the members of the game, grouped by side.
+
+        The roster is loaded with a single query the first time it is needed
+        and then cached on this instance, which only lives for one command
+        invocation.
+        """
+        if self._roster is None:
+            self._roster = Roster(self)
+        return self._roster
+
+    async def load_roster(self) -> Roster:
+        """Load the roster without blocking, if it isn't already cached."""
+        if self._roster is None:
+            self._roster = await read(Roster, self)
+        return self._roster
+
+    def forget_roster(self):
+        """Discard the cached roster after the members have changed."""
+        self._roster = None
+
+    def players(self, side: Optional[int] = None) -> ModelSelect:
+        """Make a query for the players in the game, or on one side."""
+        query = Player.select().join(GameMember).where(GameMember.game == self)
+        if side:
+            query = query.where(GameMember.side == side)
+        return query
+
+    def players_owning(
+            self, tribes: Union[Tribe, Iterable[Tribe]],
+            side: Optional[int] = None) -> list[Player]:
+        """Get the players in the game who own every one of some tribes."""
+        return list(self.players(side).where(
+            Player.tribes.contains_all(tribes)
+        ))
+
+    def tribe_counts(self, side: Optional[int] = None) -> dict[Tribe, int]:
+        """Count how many players in the game own each tribe."""
+        return Player.tribe_counts(self.players(side))
+
+    def assign_tribes(self) -> dict[int, Optional[Tribe]]:
+        """Give as many players as possible a different tribe they own.
+
+        Returns the tribe for each player by discord ID, or None for players
+        that couldn't be given one.
+        """
+        return assign_tribes(dict(
+            self.players().select(Player.discord_id, Player.tribes).tuples()
+        ))
+
+    def player_offsets(self) -> dict[int, Optional[datetime.timedelta]]:
+        """Get the UTC offset of each player in the game, by discord ID."""
+        return {
+            discord_id: timezone.timedelta if timezone else None
+            for discord_id, timezone in self.players().select(
+                Player.discord_id, Player.utc_offset
+            ).tuples()
+        }
+
+    async def load_schedule(self) -> schedule.Schedule:
+        """Get when the game's players are awake, loading it if necessary."""
+        if not (found := schedules.get(self.id)):
+            found = schedules.load(self.id, await read(self.player_offsets))
+        return found
+
+    def save(self, *args: Any, **kwargs: Any) -> int:
+        """Save the game, without overwriting the member counts.
+
+        The stored counts may have changed since this game was loaded, so
+        they are only changed by `change_member_count`.
+        """
+        if self.id is not None and 'only' not in kwargs:
+            counts = {'member_count', 'side_1_count', 'side_2_count'}
+            kwargs['only'] = [
+                field for field in self._meta.sorted_fields
+                if field.name not in counts
+            ]
+        return super().save(*args, **kwargs)
+
+    def change_member_count(self, side: int, change: int):
+        """Add to (or subtract from) the member count of the game and a side.
+
+        This should be run in the same transaction as the change to the
+        game's members.
+        """
+        side_count = f'side_{side}_count'
+        Game.update({
+            Game.member_count: Game.member_count + change,
+            getattr(Game, side_count): getattr(Game, side_count) + change
+        }).where(Game.id == self.id).execute()
+        self.member_count += change
+        setattr(self, side_count, getattr(self, side_count) + change)
+
+    @classmethod
+    def repair_member_counts(
+            cls, game_ids: Optional[list[int]] = None) -> list[int]:
+        """Recount the members of games, fixing any wrong counts.
+
+        Every game is recounted unless a list of game IDs is given. Returns
+        the IDs of the games which had wrong counts.
+        """
+        games = cls.select(
+            cls.id, cls.member_count, cls.side_1_count, cls.side_2_count
+        )
+        members = GameMember.select(
+            GameMember.game_id, GameMember.side, fn.COUNT(GameMember.id)
+        ).group_by(GameMember.game_id, GameMember.side)
+        if game_ids is not None:
+            games = games.where(cls.id.in_(game_ids))
+            members = members.where(GameMember.game_id.in_(game_ids))
+        counts = {}
+        for game_id, side, count in members.tuples():
+            counts[game_id, side] = count
+        repaired = []
+        for game in games:
+            side_1 = counts.get((game.id, 1), 0)
+            side_2 = counts.get((game.id, 2), 0)
+            actual = (side_1 + side_2, side_1, side_2)
+            stored = (game.member_count, game.side_1_count, game.side_2_count)
+            if actual != stored:
+                cls.update(
+                    member_count=side_1 + side_2,
+                    side_1_count=side_1,
+                    side_2_count=side_2
+                ).where(cls.id == game.id).execute()
+                repaired.append(game.id)
+        return repaired
 
     @property
     def player_list(self) -> str:
@@ -82,32 +239,27 @@ class Game(BaseModel):
         lines = []
         for side in (1, 2):
             lines.append(f'**__Side {side}__**')
-            players = Player.select().join(GameMember).where(
-                GameMember.game == self,
-                GameMember.side == side
-            )
-            for player in players:
+            members = self.roster.sides[side]
+            for member in members:
                 ign = (
-                    player.steam_name if self.is_steam else player.mobile_name
+                    member.steam_name if self.is_steam else member.mobile_name
                 )
-                lines.append(f'<@{player.discord_id}> - `{ign}`')
-            if not players.count():
+                lines.append(f'<@{member.discord_id}> - `{ign}`')
+            if not members:
                 lines.append('*No-one yet*')
         return '\n'.join(lines)
 
     @property
     def channel_ids(self) -> list[int]:
         """Get a list of all channel IDs related to the game."""
-        channels = [
+        return [
             self.category_id,
             self.observer_channel_id,
             self.player_channel_id,
             self.side_1_channel_id,
-            self.side_2_channel_id
+            self.side_2_channel_id,
+            *self.roster.channel_ids
         ]
-        for member in GameMember.select().where(GameMember.game == self):
-            channels.append(member.channel_id)
-        return channels
 
     @property
     def role_ids(self) -> list[int]:
@@ -126,40 +278,79 @@ class Game(BaseModel):
         )
 
     async def setup(self, guild: discord.Guild):
-        """Setup the Discord roles and channels for this game."""
-        observer_role = await self.new_role(guild, 'Observer')
-        self.observer_role_id = observer_role.id
-        player_role = await self.new_role(guild, 'Player')
-        self.player_role_id = player_role.id
-        side_1_role = await self.new_role(guild, 'Side 1')
-        self.side_1_role_id = side_1_role.id
-        side_2_role = await self.new_role(guild, 'Side 2')
-        self.side_2_role_id = side_2_role.id
-        category = await guild.create_category(name=self.name)
-        self.category_id = category.id
-        base_perms = {guild.default_role: NO_PERMS, observer_role: READ_PERMS}
-        self.observer_channel_id = (await category.create_text_channel(
-            name='audience',
-            overwrites={
-                **base_perms,
-                observer_role: WRITE_PERMS, player_role: WRITE_PERMS
-            }
-        )).id
-        self.player_channel_id = (await category.create_text_channel(
-            name='diplomatic-relations',
-            overwrites={**base_perms, player_role: WRITE_PERMS}
-        )).id
-        self.side_1_channel_id = (await category.create_text_channel(
-            name='side-1', overwrites={**base_perms, side_1_role: WRITE_PERMS}
-        )).id
-        self.side_2_channel_id = (await category.create_text_channel(
-            name='side-2', overwrites={**base_perms, side_2_role: WRITE_PERMS}
-        )).id
-        self.save()
-
-    def get_member(self, player: Player) -> GameMember:
+        """Setup the Discord roles and channels for this game.
+
+        Roles and channels which still exist from an earlier, failed attempt
+        are reused, so this can be run again to finish setting up a game.
+        """
+        def new_role(name: str) -> provision.Step:
+            return provision.Step((), lambda done: self.new_role(guild, name))
+
+        def new_channel(
+                name: str, position: int,
+                writers: tuple[str, ...]) -> provision.Step:
+            async def create(done: dict) -> discord.TextChannel:
+                overwrites = {
+                    guild.default_role: NO_PERMS,
+                    done['observer_role']: READ_PERMS
+                }
+                for writer in writers:
+                    overwrites[done[writer]] = WRITE_PERMS
+                return await done['category'].create_text_channel(
+                    name=name, position=position, overwrites=overwrites
+                )
+
+            return provision.Step(
+                ('category', 'observer_role', *writers), create
+            )
+
+        steps = {
+            'observer_role': new_role('Observer'),
+            'player_role': new_role('Player'),
+            'side_1_role': new_role('Side 1'),
+            'side_2_role': new_role('Side 2'),
+            'category': provision.Step(
+                (), lambda done: guild.create_category(name=self.name)
+            ),
+            'observer_channel': new_channel(
+                'audience', 0, ('observer_role', 'player_role')
+            ),
+            'player_channel': new_channel(
+                'diplomatic-relations', 1, ('player_role',)
+            ),
+            'side_1_channel': new_channel('side-1', 2, ('side_1_role',)),
+            'side_2_channel': new_channel('side-2', 3, ('side_2_role',))
+        }
+        done = {}
+        for name in steps:
+            object_id = getattr(self, f'{name}_id')
+            if name.endswith('_role'):
+                existing = guild.get_role(object_id)
+            else:
+                existing = guild.get_channel(object_id)
+            if existing:
+                done[name] = existing
+
+        async def save_progress(name: str, created: discord.abc.Snowflake):
+            setattr(self, f'{name}_id', created.id)
+            await self.asave()
+
+        await provision.provision(steps, done, save_progress)
+
+    async def release(self, member: GameMember) -> bool:
+        """Give up a member's place in the game.
+
+        Returns False if someone else already removed them.
+        """
+        if not await write(member.leave, self):
+            return False
+        self.forget_roster()
+        schedules.leave(self.id, member.player_id)
+        return True
+
+    async def get_member(self, player: Player) -> GameMember:
         """Get the GameMember record associated with this game and a player."""
-        return GameMember.get_or_none(
+        return await GameMember.aget_or_none(
             GameMember.game == self,
             GameMember.player == player
         )
@@ -185,7 +376,7 @@ class Game(BaseModel):
                 user=ctx.author
             )
 
-    def player_can_join(
+    async def player_can_join(
             self,
             ctx: commands.Context,
             user: UserData,
@@ -204,65 +395,93 @@ class Game(BaseModel):
             if not player.mobile_name:
                 ctx.logger.log(wrong_game_type.format('mobile'))
                 return False
-        if self.get_member(player):
-            ctx.logger.log(
-                f'Error: {user.name} {user.to_be} already in game {self.id}.'
-            )
+        if self.member_count >= self.space_count:
+            ctx.logger.log(f'Error: {self.name} is already full.')
             return False
         return True
 
     async def add_player(
             self, ctx: commands.Context, user: discord.Member = None):
-        """Add a player to the game."""
+        """Add a player to the game.
+
+        A place is reserved for them before their channel is created, so
+        the game can't be overfilled by players joining at the same time.
+        """
         user = self.user_info(ctx, user)
-        player = Player.get_player(user.user.id)
-        if not self.player_can_join(ctx, user, player):
+        player = await Player.aget_player(user.user.id)
+        if not await self.player_can_join(ctx, user, player):
             return
-        side = GameMember.choose_side(self)
+        try:
+            member = await write(GameMember.reserve, self, player)
+        except IntegrityError:
+            ctx.logger.log(
+                f'Error: {user.name} {user.to_be} already in game {self.id}.'
+            )
+            return
+        if not member:
+            ctx.logger.log(f'Error: {self.name} is already full.')
+            return
+        self.forget_roster()
+        try:
+            await self.provision_member(ctx, user.user, member)
+        except Exception:
+            await self.release(member)
+            raise
+        names.forget_game(ctx.guild.id, self.id)
+        schedules.join(self.id, player.discord_id, player.utc_timedelta)
+        ctx.logger.log(f'Added {user.name} to game {self.id}.')
+        if self.member_count >= self.space_count:
+            ctx.logger.log(f'{self.name} is now full.')
+
+    async def provision_member(
+            self, ctx: commands.Context, user: discord.Member,
+            member: GameMember):
+        """Create the channel and give the roles for a reserved place."""
         side_channel = ctx.guild.get_channel(
-            self.side_1_channel_id if side == 1 else self.side_2_channel_id
+            self.side_1_channel_id if member.side == 1
+            else self.side_2_channel_id
         )
         observer_role = ctx.guild.get_role(self.observer_role_id)
         player_role = ctx.guild.get_role(self.player_role_id)
-        channel_id = (await side_channel.category.create_text_channel(
-            user.user.display_name,
+        side_role = ctx.guild.get_role(
+            self.side_1_role_id if member.side == 1 else self.side_2_role_id
+        )
+        channel = await side_channel.category.create_text_channel(
+            user.display_name,
             position=side_channel.position,
             overwrites={
                 ctx.guild.default_role: NO_PERMS,
                 observer_role: READ_PERMS,
                 player_role: NO_PERMS,
-                user.user: WRITE_PERMS
+                user: WRITE_PERMS
             }
-        )).id
-        GameMember.create(
-            player=player, game=self, side=side, channel_id=channel_id
         )
-        side_role = ctx.guild.get_role(
-            self.side_1_role_id if side == 1 else self.side_2_role_id
-        )
-        player_role = ctx.guild.get_role(self.player_role_id)
-        await user.user.add_roles(player_role, side_role)
-        await user.user.remove_roles(observer_role)
-        ctx.logger.log(f'Added {user.name} to game {self.id}.')
-        if self.member_count >= self.space_count:
-            self.is_open = False
-            self.save()
-            ctx.logger.log(f'{self.name} is now full.')
+        try:
+            member.channel_id = channel.id
+            await member.asave()
+            await user.add_roles(player_role, side_role)
+            await user.remove_roles(observer_role)
+        except Exception:
+            await channel.delete()
+            raise
 
     async def remove_player(
             self, ctx: commands.Context, user: discord.Member = None):
         """Remove a player from the game."""
         user = self.user_info(ctx, user)
-        player = Player.get_player(user.user.id)
-        if member := self.get_member(player):
+        player = await Player.aget_player(user.user.id)
+        member = await self.get_member(player)
+        # Only whoever deletes the record goes on to tidy up after it.
+        if member and await self.release(member):
+            names.forget_game(ctx.guild.id, self.id)
             side_role = ctx.guild.get_role(
                 self.side_1_role_id if member.side == 1
                 else self.side_2_role_id
             )
             player_role = ctx.guild.get_role(self.player_role_id)
             await user.user.remove_roles(player_role, side_role)
-            await ctx.guild.get_channel(member.channel_id).delete()
-            member.delete_instance()
+            if channel := ctx.guild.get_channel(member.channel_id):
+                await channel.delete()
             ctx.logger.log(f'Removed {user.name} from game {self.id}.')
         else:
             ctx.logger.log(
@@ -271,30 +490,47 @@ class Game(BaseModel):
 
 
 class GameMember(BaseModel):
-    """Many-to-many field between Game and Player."""
+    """Many-to-many field between Game and Player.
+
+    A player can only be in a game once.
+    """
 
     game = ForeignKeyField(model=Game)
     player = ForeignKeyField(model=Player)
-    channel_id = IntegerField()
+    channel_id = IntegerField(null=True)    # Null while joining.
     side = IntegerField()    # Either 1 or 2.
+    webhook_url = TextField(null=True)
+
+    class Meta:
+        """Peewee settings."""
+
+        indexes = (
+            (('game', 'player'), True),
+            (('game', 'side'), False)
+        )
 
     @classmethod
     async def convert(
             cls, ctx: commands.Context, raw_argument: str) -> GameMember:
         """Get a member of the game this command was run for."""
-        game = Game.get_or_none(Game.category_id == ctx.channel.category_id)
+        game = await Game.aget_or_none(
+            Game.category_id == ctx.channel.category_id
+        )
         if not game:
             raise commands.BadArgument(
                 'This command must be run in a game channel.'
             )
-        members = cls.select().where(cls.game_id == game.id)
-        matches = []
-        search = re.sub(r'[^a-z0-9]', '', raw_argument.lower())
-        for member in members:
-            if str(member.player_id) == search:
-                return member
-            if await member.name_matches(ctx.guild, search):
-                matches.append(member)
+        members = {
+            member.player_id: member
+            for member in await read(list, cls.select().where(
+                cls.game_id == game.id, cls.channel_id.is_null(False)
+            ))
+        }
+        search = names.normalise(raw_argument)
+        if search.isdigit() and int(search) in members:
+            return members[int(search)]
+        index = await names.get_game_names(ctx.guild, game.id, list(members))
+        matches = [members[user_id] for user_id in index.search(search)]
         if len(matches) == 1:
             return matches[0]
         if not matches:
@@ -308,11 +544,41 @@ class GameMember(BaseModel):
     @classmethod
     def choose_side(cls, game: Game) -> int:
         """Choose the side of a game with fewer members."""
-        side_1, side_2 = cls.select(
-            fn.COUNT(cls.id).filter(cls.side == 1),
-            fn.COUNT(cls.id).filter(cls.side == 2)
-        ).where(cls.game == game).scalar(as_tuple=True)
-        return 1 if side_1 <= side_2 else 2
+        return 1 if game.side_1_count <= game.side_2_count else 2
+
+    @classmethod
+    def reserve(cls, game: Game, player: Player) -> Optional[GameMember]:
+        """Reserve a place in a game for a player, if there is space.
+
+        This must be run in a transaction (eg. with `write`), so that the
+        place can't be taken between checking the member count and
+        inserting. The game's member counts are refreshed from the database
+        and updated. Returns the new member, or None if the game is full.
+        Raises IntegrityError if the player is already in the game.
+        """
+        game.member_count, game.side_1_count, game.side_2_count = (
+            Game.select(
+                Game.member_count, Game.side_1_count, Game.side_2_count
+            ).where(Game.id == game.id).tuples().get()
+        )
+        if game.member_count >= game.space_count:
+            return None
+        member = cls.create(
+            game=game, player=player, side=cls.choose_side(game)
+        )
+        game.change_member_count(member.side, 1)
+        return member
+
+    def leave(self, game: Game) -> bool:
+        """Delete this member, and update the game's member counts.
+
+        This must be run in a transaction (eg. with `write`). Returns False
+        if the member was already deleted.
+        """
+        if not self.delete_instance():
+            return False
+        game.change_member_count(self.side, -1)
+        return True
 
     async def get_user(self, guild: discord.Guild) -> Optional[discord.Member]:
         """Get the Discord member for this game member."""
@@ -323,16 +589,38 @@ class GameMember(BaseModel):
         except discord.HTTPException:
             return None
 
-    async def name_matches(self, guild: discord.Guild, search: str) -> bool:
-        """Check if the player's name matches a given search."""
-        user = await self.get_user(guild)
-        if not user:
-            return False
-        names = [user.display_name, user.name]
-        return any(
-            search in re.sub(r'[^a-z0-9]', '', name.lower())
-            for name in names
-        )
+
+class Roster:
+    """Every member of a game, grouped by side.
+
+    Loaded with a single joined query so that the player list and channel
+    list can both be worked out without going back to the database.
+    """
+
+    def __init__(self, game: Game):
+        """Load the members of a game from the database."""
+        self.sides = {1: [], 2: []}
+        query = GameMember.select(
+            GameMember.side,
+            GameMember.channel_id,
+            Player.discord_id,
+            Player.mobile_name,
+            Player.steam_name
+        ).join(Player).where(
+            GameMember.game == game
+        ).order_by(GameMember.id).namedtuples()
+        for member in query:
+            self.sides[member.side].append(member)
+
+    def __iter__(self) -> Iterator:
+        """Iterate over the members of both sides."""
+        for side in (1, 2):
+            yield from self.sides[side]
+
+    @property
+    def channel_ids(self) -> list[int]:
+        """Get the private channel ID of each member."""
+        return [member.channel_id for member in self if member.channel_id]
 
 
-db.create_tables([Game, GameMember])
+create_tables([Game, GameMember])
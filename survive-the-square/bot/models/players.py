@@ -1,11 +1,59 @@
 """Peewee model for a player."""
 from __future__ import annotations
 
-from peewee import IntegerField, TextField
+import datetime
+from collections import namedtuple
+from typing import Any, Optional
 
-from . import timezones
-from .database import db, BaseModel
-from .tribes import Tribe, TribeList, TribeListField
+from peewee import IntegerField, ModelSelect, OperationalError, TextField
+from polycore import timezones
+from polycore.lru import LRUCache
+from polycore.tribes import Tribe, TribeList, TribeListField
+
+from .database import create_tables, db, write, BaseModel
+
+
+# The names are highlighted where they match, or None if they don't.
+NameMatch = namedtuple(
+    'NameMatch', ['discord_id', 'mobile_name', 'steam_name']
+)
+
+PLAYER_CACHE_SIZE = 1000
+
+# A full text index of players' names, split into trigrams so that any part
+# of a name can be searched for. It reads names from the player table, and
+# triggers keep it up to date as players are added and changed. New player
+# tables are created with it, and older ones get it from a migration.
+NAME_INDEX_SQL = (
+    'CREATE VIRTUAL TABLE player_name_fts USING fts5('
+    'mobile_name, steam_name, content=player, content_rowid=discord_id, '
+    'tokenize=trigram)',
+    'CREATE TRIGGER player_name_fts_insert AFTER INSERT ON player BEGIN '
+    'INSERT INTO player_name_fts(rowid, mobile_name, steam_name) '
+    'VALUES (new.discord_id, new.mobile_name, new.steam_name); END',
+    'CREATE TRIGGER player_name_fts_delete AFTER DELETE ON player BEGIN '
+    'INSERT INTO player_name_fts('
+    'player_name_fts, rowid, mobile_name, steam_name) '
+    "VALUES ('delete', old.discord_id, old.mobile_name, old.steam_name); END",
+    'CREATE TRIGGER player_name_fts_update '
+    'AFTER UPDATE OF mobile_name, steam_name ON player BEGIN '
+    'INSERT INTO player_name_fts('
+    'player_name_fts, rowid, mobile_name, steam_name) '
+    "VALUES ('delete', old.discord_id, old.mobile_name, old.steam_name); "
+    'INSERT INTO player_name_fts(rowid, mobile_name, steam_name) '
+    'VALUES (new.discord_id, new.mobile_name, new.steam_name); END'
+)
+NAME_SEARCH_SQL = (
+    'SELECT rowid, mobile_name, steam_name, '
+    "highlight(player_name_fts, 0, '**', '**'), "
+    "highlight(player_name_fts, 1, '**', '**') "
+    'FROM player_name_fts WHERE player_name_fts MATCH ? '
+    'ORDER BY rank LIMIT ?'
+)
+
+# Recently used players by discord ID, so that active players' profiles
+# needn't be loaded for every command. Only used from the event loop.
+player_cache = LRUCache(PLAYER_CACHE_SIZE)
 
 
 class Player(BaseModel):
@@ -19,6 +67,14 @@ class Player(BaseModel):
         Tribe.XIN_XI, Tribe.BARDUR, Tribe.OUMAJI, Tribe.IMPERIUS
     )))
 
+    class Meta:
+        """Peewee settings."""
+
+        # Players are cached for a long time, so saving a cached player
+        # must only write what was changed, not overwrite columns (like
+        # wins) which may have been updated since it was loaded.
+        only_save_dirty = True
+
     @classmethod
     def get_player(cls, discord_id: int) -> Player:
         """Get a player by discord ID, or create one if not found."""
@@ -26,5 +82,110 @@ class Player(BaseModel):
             return player
         return cls.create(discord_id=discord_id)
 
+    @classmethod
+    async def aget_player(cls, discord_id: int) -> Player:
+        """Awaitable version of get_player, which uses the cache."""
+        if player := player_cache.get(discord_id):
+            return player
+        player = await cls.aget_or_none(cls.discord_id == discord_id)
+        if not player:
+            # Check again on the writer thread, in case of a concurrent
+            # create.
+            player = await write(cls.get_player, discord_id)
+        player_cache.put(discord_id, player)
+        return player
+
+    async def asave(self, *args: Any, **kwargs: Any) -> int:
+        """Awaitable version of save, which also updates the cache.
+
+        Use this rather than `save`, which leaves any cached copy of the
+        player out of date.
+        """
+        try:
+            saved = await super().asave(*args, **kwargs)
+        except Exception:
+            # Don't leave unsaved changes in the cache.
+            player_cache.discard(self.discord_id)
+            raise
+        player_cache.put(self.discord_id, self)
+        return saved
+
+    @property
+    def utc_timedelta(self) -> Optional[datetime.timedelta]:
+        """Get the player's UTC offset, or None if it isn't known."""
+        return self.utc_offset.timedelta if self.utc_offset else None
+
+    @classmethod
+    def tribe_counts(
+            cls, players: Optional[ModelSelect] = None) -> dict[Tribe, int]:
+        """Count how many players own each tribe, in a single query.
+
+        `players` is a query for the players to count, by default everyone.
+        """
+        if players is None:
+            players = cls.select()
+        counts = players.select(*cls.tribes.count_owners()).scalar(
+            as_tuple=True
+        )
+        return {tribe: count or 0 for tribe, count in zip(Tribe, counts)}
+
+    @classmethod
+    def search_names(cls, search: str, limit: int = 20) -> list[NameMatch]:
+        """Search for players by in-game name (mobile or steam).
+
+        The best matches come first.
+        """
+        if has_name_index and len(search) >= 3:
+            phrase = '"' + search.replace('"', '""') + '"'
+            rows = db.execute_sql(NAME_SEARCH_SQL, (phrase, limit))
+            return [
+                NameMatch(
+                    discord_id,
+                    marked_mobile if marked_mobile != mobile else None,
+                    marked_steam if marked_steam != steam else None
+                ) for discord_id, mobile, steam, marked_mobile, marked_steam
+                in rows
+            ]
+        # The index can only find searches of at least three characters.
+        query = cls.select(
+            cls.discord_id, cls.mobile_name, cls.steam_name
+        ).where(
+            (cls.mobile_name ** f'%{search}%')
+            | (cls.steam_name ** f'%{search}%')
+        ).limit(limit)
+        return [
+            NameMatch(
+                player.discord_id,
+                highlight(player.mobile_name, search),
+                highlight(player.steam_name, search)
+            ) for player in query
+        ]
+
+
+def highlight(name: Optional[str], search: str) -> Optional[str]:
+    """Highlight where a name contains a search, or get None if it doesn't."""
+    if name and (start := name.lower().find(search.lower())) != -1:
+        end = start + len(search)
+        return f'{name[:start]}**{name[start:end]}**{name[end:]}'
+    return None
+
+
+def create_name_index():
+    """Create the full text index of players' names, for a new player table.
+
+    The index needs SQLite 3.34 or later. If it can't be created, searches
+    are done with a (slower) LIKE query instead.
+    """
+    try:
+        with db.atomic():
+            for statement in NAME_INDEX_SQL:
+                db.execute_sql(statement)
+    except OperationalError:
+        pass
+
 
-db.create_tables([Player])
+if not Player.table_exists():
+    create_tables([Player])
+    create_name_index()
+# Older databases only have the index once its migration is applied.
+has_name_index = 'player_name_fts' in db.get_tables()
@@ -0,0 +1,13 @@
+"""Migration to store the webhook for each game member's channel."""
+from playhouse.migrate import migrate, SqliteMigrator
+
+from bot.models import GameMember
+
+
+def apply(migrator: SqliteMigrator):
+    """Add a webhook URL field to the game member table."""
+    migrate(
+        migrator.add_column(
+            'gamemember', 'webhook_url', GameMember.webhook_url
+        )
+    )
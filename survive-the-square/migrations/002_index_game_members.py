@@ -0,0 +1,19 @@
+"""Migration to index game members, and stop players joining games twice."""
+from playhouse.migrate import migrate, SqliteMigrator
+
+from bot.models.database import db
+
+
+def apply(migrator: SqliteMigrator):
+    """Remove duplicate game members, then index the game member table."""
+    # Only keep the first record of a player being in a game.
+    db.execute_sql(
+        'DELETE FROM gamemember WHERE id NOT IN ('
+        'SELECT MIN(id) FROM gamemember GROUP BY game_id, player_id)'
+    )
+    migrate(
+        migrator.add_index(
+            'gamemember', ('game_id', 'player_id'), unique=True
+        ),
+        migrator.add_index('gamemember', ('game_id', 'side'))
+    )
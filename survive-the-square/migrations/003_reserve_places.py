@@ -0,0 +1,7 @@
+"""Migration to let places in games be reserved before channels exist."""
+from playhouse.migrate import migrate, SqliteMigrator
+
+
+def apply(migrator: SqliteMigrator):
+    """Make the game member channel ID field nullable."""
+    migrate(migrator.drop_not_null('gamemember', 'channel_id'))
@@ -0,0 +1,17 @@
+"""Migration to store the number of members of each game and side."""
+from playhouse.migrate import migrate, SqliteMigrator
+from polycore.db import backfill
+
+from bot.models import Game
+
+
+def apply(migrator: SqliteMigrator):
+    """Add member count fields to the game table, and fill them in."""
+    migrate(
+        migrator.add_column('game', 'member_count', Game.member_count),
+        migrator.add_column('game', 'side_1_count', Game.side_1_count),
+        migrator.add_column('game', 'side_2_count', Game.side_2_count)
+    )
+    backfill(Game.select(Game.id), lambda games: Game.repair_member_counts(
+        [game.id for game in games]
+    ))